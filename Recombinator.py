@@ -1,54 +1,39 @@
 import streamlit as st
-from math import comb
-import re
-import sys 
+import metrics
+from engine import (Affix, RecombinationRequest, Scenario, PREFIX, SUFFIX, BASE_ANY, BASE_ITEM1, BASE_ITEM2,
+                    evaluate_scenario, parse_item_text)
+from incremental import LiveScenario
+from sweep import sweep
+from translations import translations
+from ui_assets import stylesheet
 
 # -------------------------
 # Page config & CSS 
 # -------------------------
 st.set_page_config(page_title="Recombinator Calculator", layout="wide")
 
-st.markdown("""
-    <style>
-    /* CSS KODU (Değişmedi) */
-    .stTextInput > div > div > input { height: 28px; padding: 2px 8px; font-size: 13px; }
-    .stCheckbox { margin-bottom: 0px !important; margin-top: 0px !important; }
-    .stCheckbox label { 
-        font-size: 11px;
-        padding-top: 0px;
-        padding-bottom: 0px;
-    }
-    .stCheckbox [data-testid="stText"] { line-height: 1.1; }
-    div[data-testid="stVerticalBlock"] > div { padding-top: 0rem; padding-bottom: 0rem; }
-    .main > div { padding-top: 0.5rem; }
-    h1 { text-align: center; margin-bottom: 0.5rem; font-size: 24px; }
-    h3 { margin-top: 0.2rem; margin-bottom: 0.2rem; font-size: 16px; }
-    .stButton > button { width: 100%; padding: 4px; font-size: 13px; }
-    .result-text { text-align: center; font-size: 18px; font-weight: bold; margin-top: 10px; color: #1f77b4; }
-    .error-text { text-align: center; font-size: 16px; font-weight: bold; margin-top: 10px; color: #d62728; }
-    .affix-group {
-        border-top: 1px solid #e0e0e0;
-        padding: 5px 0;
-        margin-bottom: 0px;
-    }
-    .affix-group:first-child {
-        border-top: none;
-    }
-    .checkbox-stack {
-        display: flex;
-        flex-direction: column;
-        justify-content: flex-start;
-        align-items: flex-start;
-        height: 100%;
-        margin-top: 10px;
-    }
-    .checkbox-stack .stCheckbox {
-        padding: 0;
-        margin: 0;
-        height: 15px;
-    }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{stylesheet()}</style>", unsafe_allow_html=True)
+
+
+# -------------------------
+# Process-wide caches (shared by every browser session)
+# -------------------------
+RESULT_CACHE_ENTRIES = 4096
+PARSE_CACHE_ENTRIES = 1024
+CACHE_TTL = 3600  # seconds
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_result(scenario_key):
+    # Anahtar widget key'leri değil, kanonik senaryo: (mod id'leri, bayraklar, base).
+    # Id'ler her senaryoda ilk görülen slot sırasıyla verilir; aynı şekildeki senaryolar,
+    # mod adları farklı olsa da, aynı girdiyi paylaşır.
+    mods, flags, base = scenario_key
+    return evaluate_scenario(Scenario(mods, flags, base))
+
+@st.cache_data(max_entries=PARSE_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_parse_item_text(item_text):
+    # st.cache_data metnin hash'i ile anahtarlar; aynı item tekrar parse edilmez.
+    return parse_item_text(item_text)
 
 
 # -------------------------
@@ -71,6 +56,7 @@ def safe_rerun():
 def handle_item1_base_change():
     is_checked = st.session_state['item1_base_check']
     st.session_state['item1_base_desired'] = is_checked
+    get_live_scenario().set_base(BASE_ITEM1 if is_checked else session_base())
     
     if is_checked and st.session_state.get('item2_base_desired', False):
         st.session_state['item2_base_desired'] = False
@@ -80,6 +66,7 @@ def handle_item1_base_change():
 def handle_item2_base_change():
     is_checked = st.session_state['item2_base_check']
     st.session_state['item2_base_desired'] = is_checked
+    get_live_scenario().set_base(BASE_ITEM2 if is_checked else session_base())
 
     if is_checked and st.session_state.get('item1_base_desired', False):
         st.session_state['item1_base_desired'] = False
@@ -88,249 +75,67 @@ def handle_item2_base_change():
 
 
 # -------------------------
-# Calculation functions 
+# Live (incremental) scenario
 # -------------------------
+def get_live_scenario():
+    if 'live_scenario' not in st.session_state:
+        scenario = LiveScenario()
+        scenario.load(build_request_from_session())
+        st.session_state['live_scenario'] = scenario
+    return st.session_state['live_scenario']
 
-def get_count_probabilities(count):
-    if count == 0: return {0: 1.0}
-    if count == 1: return {0: 0.41, 1: 0.59}
-    if count == 2: return {1: 0.667, 2: 0.333}
-    if count == 3: return {1: 0.40, 2: 0.50, 3: 0.10} 
-    if count == 4: return {1: 0.10, 2: 0.60, 3: 0.30}
-    if count == 5: return {2: 0.43, 3: 0.57}
-    if count == 6: return {2: 0.30, 3: 0.70}
-    return {}
-
-def calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, winning_base):
-    available_mods = []
-    for mod_info in all_mods_list:
-        # Non-Native kuralı: Non-Native modlar, onu taşımayan base kazanırsa düşer.
-        if mod_info['non_native'] and mod_info['item'] != winning_base:
-            continue
-        available_mods.append(mod_info['mod'])
-    
-    selectable_mods_pool = list(set(available_mods))
-    
-    # İstenen modların hepsi havuzda olmalı
-    for desired in desired_mods:
-        if desired not in selectable_mods_pool: return 0.0 
-    
-    selectable_mods = [m for m in selectable_mods_pool if m not in not_desired_mods]
-    
-    if len(desired_mods) > outcome_count: return 0.0
-    
-    non_desired_selectable = [m for m in selectable_mods if m not in desired_mods]
-    total_unique_selectable = len(desired_mods) + len(non_desired_selectable)
-    
-    if total_unique_selectable < outcome_count:
-        if len(desired_mods) == total_unique_selectable: return 1.0
-        else:
-             if outcome_count > total_unique_selectable and outcome_count > 3: return 0.0
-             
-    if len(selectable_mods) < outcome_count: return 0.0 
-    
-    filled_slots = len(desired_mods)
-    remaining_slots = outcome_count - filled_slots 
-    
-    if remaining_slots < 0: return 0.0
-    if remaining_slots > len(non_desired_selectable): return 0.0
-    
-    favorable_combinations = comb(len(non_desired_selectable), remaining_slots)
-    total_combinations = comb(len(selectable_mods), outcome_count)
-    
-    if total_combinations == 0: return 0.0
-    
-    return favorable_combinations / total_combinations
+def handle_affix_change(item_num, slot, field, key):
+    # Sadece değişen affix güncellenir; diğer taraf (prefix/suffix) cache'ten gelir.
+    value = st.session_state.get(key, '' if field == 'mod' else False)
+    get_live_scenario().set(item_num, slot, field, value)
 
-def calculate_modifier_probability(mods_item1, mods_item2, desired_mods, not_desired_mods, item1_base_desired, item2_base_desired):
-    
-    all_mods_list = mods_item1 + mods_item2
-    total_mod_count = len(all_mods_list)
-    
-    if total_mod_count == 0: return 0.0 if len(desired_mods) > 0 else 1.0
-
-    count_probs = get_count_probabilities(total_mod_count)
-    total_prob = 0.0
-    
-    for outcome_count, count_prob in count_probs.items():
-        if outcome_count == 0:
-            if len(desired_mods) == 0: total_prob += count_prob
-            continue
-        
-        if len(desired_mods) > outcome_count: continue
-        
-        # Base'e göre mod başarı olasılıklarını hesapla
-        prob_base1_affix = calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, 1)
-        prob_base2_affix = calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, 2)
-        
-        # Base Seçimi Faktörü
-        if not item1_base_desired and not item2_base_desired:
-             # Base seçili değilse: (P(Base 1) * P(Affix | B1)) + (P(Base 2) * P(Affix | B2))
-             selection_prob = (prob_base1_affix * 0.5) + (prob_base2_affix * 0.5)
-             
-        elif item1_base_desired: 
-             # Base 1 isteniyor: Olasılık yarıya iner (sizin istediğiniz kurala göre).
-             selection_prob = prob_base1_affix * 0.5
-        elif item2_base_desired: 
-             # Base 2 isteniyor: Olasılık yarıya iner.
-             selection_prob = prob_base2_affix * 0.5
-        else:
-             selection_prob = 0.0 
-
-        
-        total_prob += count_prob * selection_prob
-    
-    return total_prob
-
-def parse_item_text(item_text):
-    lines = item_text.strip().split('\n')
-    prefixes = []
-    suffixes = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if 'Prefix Modifier' in line:
-            if i + 1 < len(lines):
-                mod_line = lines[i + 1].strip()
-                mod_clean = re.sub(r'\s*T\d+\s*', '', mod_line)
-                mod_clean = re.sub(r'\s*\(\d+–\d+\)', '', mod_clean)
-                prefixes.append(mod_clean)
-                i += 1
-        elif 'Suffix Modifier' in line:
-            if i + 1 < len(lines):
-                mod_line = lines[i + 1].strip()
-                mod_clean = re.sub(r'\s*T\d+\s*', '', mod_line)
-                mod_clean = re.sub(r'\s*\(\d+–\d+\)', '', mod_clean)
-                suffixes.append(mod_clean)
-                i += 1
-        i += 1
-    return prefixes, suffixes
 
+# -------------------------
+# Calculation functions 
+# -------------------------
+def session_base():
+    if st.session_state.get('item1_base_desired', False): return BASE_ITEM1
+    if st.session_state.get('item2_base_desired', False): return BASE_ITEM2
+    return BASE_ANY
+
+def build_request_from_session():
+    affixes = {1: [], 2: []}
+    for item_num in (1, 2):
+        for i in range(6):
+            affixes[item_num].append(Affix(
+                mod=st.session_state.get(f'item{item_num}_input_{i}', ''),
+                type=PREFIX if i < 3 else SUFFIX,
+                exclusive=st.session_state.get(f'item{item_num}_check_exclusive_{i}', False),
+                non_native=st.session_state.get(f'item{item_num}_check_non_native_{i}', False),
+                desired=st.session_state.get(f'item{item_num}_check_desired_{i}', False),
+                not_desired=st.session_state.get(f'item{item_num}_check_not_desired_{i}', False),
+            ))
+    return RecombinationRequest(item1=tuple(affixes[1]), item2=tuple(affixes[2]), base=session_base())
 
 def calculate_combined_probability():
     t = translations[st.session_state.get('language_selector', 'English')]
-    
-    prefixes_item1, prefixes_item2, suffixes_item1, suffixes_item2 = [], [], [], []
-    desired_prefixes, desired_suffixes, not_desired_prefixes, not_desired_suffixes = set(), set(), set(), set()
-    exclusive_mods = []
-    
-    # 1. Inputları topla ve Desired/Exclusive durumlarını kaydet
-    for i in range(6):
-        mod_type = 'prefix' if i < 3 else 'suffix'
-        
-        def process_item_input(item_num, input_key, exclusive_key, non_native_key, desired_key, not_desired_key, mod_list):
-            val = st.session_state.get(input_key, '').strip()
-            if not val: return
-            
-            is_exclusive = st.session_state.get(exclusive_key, False)
-            is_non_native = st.session_state.get(non_native_key, False)
-            is_desired = st.session_state.get(desired_key, False)
-            is_not_desired = st.session_state.get(not_desired_key, False)
-            
-            mod_info = {'mod': val, 'non_native': is_non_native, 'exclusive': is_exclusive, 'item': item_num, 'desired': is_desired, 'type': mod_type}
-            mod_list.append(mod_info)
-
-            if is_desired:
-                if mod_type == 'prefix': desired_prefixes.add(val)
-                else: desired_suffixes.add(val)
-            elif is_not_desired:
-                if mod_type == 'prefix': not_desired_prefixes.add(val)
-                else: not_desired_suffixes.add(val)
-                
-            if is_exclusive: exclusive_mods.append(mod_info)
-
-        # Item 1
-        process_item_input(1, f'item1_input_{i}', f'item1_check_exclusive_{i}', f'item1_check_non_native_{i}', f'item1_check_desired_{i}', f'item1_check_not_desired_{i}', prefixes_item1 if mod_type == 'prefix' else suffixes_item1)
-        
-        # Item 2
-        process_item_input(2, f'item2_input_{i}', f'item2_check_exclusive_{i}', f'item2_check_non_native_{i}', f'item2_check_desired_{i}', f'item2_check_not_desired_{i}', prefixes_item2 if mod_type == 'prefix' else suffixes_item2)
-
-    
-    # --- TEMEL HATA KONTROLLERİ ---
-    for i in range(6):
-        if st.session_state.get(f'item1_input_{i}') and st.session_state.get(f'item1_check_desired_{i}') and st.session_state.get(f'item1_check_not_desired_{i}'): return None, t['error_pref_conflict']
-        if st.session_state.get(f'item2_input_{i}') and st.session_state.get(f'item2_check_desired_{i}') and st.session_state.get(f'item2_check_not_desired_{i}'): return None, t['error_pref_conflict']
-
-    if len(desired_prefixes) > 3 or len(desired_suffixes) > 3: return None, t['error_too_many_desired']
-    if len(desired_prefixes) == 0 and len(desired_suffixes) == 0: return None, t['error_no_desired']
-    
-    
-    # --- NON-NATIVE OTOMATİK BASE SEÇİMİ VE ÇAKIŞMA KONTROLÜ (OTOMATİK SEÇİM KALDIRILDI) ---
-    
-    item1_has_non_native_desired = any(m['non_native'] and m['desired'] for m in prefixes_item1 + suffixes_item1)
-    item2_has_non_native_desired = any(m['non_native'] and m['desired'] for m in prefixes_item2 + suffixes_item2)
-
-    item1_base_desired = st.session_state.get('item1_base_desired', False)
-    item2_base_desired = st.session_state.get('item2_base_desired', False)
-    
-    # Kural: Base seçili değilken iki itemde de Non-Native Desired mod varsa hata ver.
-    if not item1_base_desired and not item2_base_desired:
-        if item1_has_non_native_desired and item2_has_non_native_desired:
-             return None, t['error_both_non_native']
-        
-        # Artık otomatik seçim yapmıyoruz. Non-Native mod varsa kullanıcı uyarılır.
-        if item1_has_non_native_desired or item2_has_non_native_desired:
-             return None, t['error_non_native_manual'] # Yeni bir hata mesajı tanımlanabilir.
-             
-    elif item1_has_non_native_desired and item2_has_non_native_desired:
-        return None, t['error_both_non_native']
-        
-    # Non-Native Çakışması Kontrolü (%0 döndürür)
-    desired_mods_all = desired_prefixes | desired_suffixes
-    
-    if item1_base_desired:
-        for mod_info in prefixes_item2 + suffixes_item2:
-            if mod_info['non_native'] and mod_info['mod'] in desired_mods_all:
-                return 0.0, None 
-
-    elif item2_base_desired:
-        for mod_info in prefixes_item1 + suffixes_item1:
-            if mod_info['non_native'] and mod_info['mod'] in desired_mods_all:
-                return 0.0, None 
-    
-    
-    # --- HARDCODED 1P/1S ÇAPRAZ İSTİSNASI ---
-    has_i1_nedp = any(m['desired'] and not m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item1)
-    has_i1_es = any(m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item1)
-    has_i2_ep = any(m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item2)
-    has_i2_neds = any(m['desired'] and not m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item2)
-    
-    is_cross_case_1 = has_i1_nedp and has_i1_es and has_i2_ep and has_i2_neds
-    is_cross_case_2 = (any(m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item1) and 
-                       any(m['desired'] and not m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item1) and
-                       any(m['desired'] and not m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item2) and
-                       any(m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item2))
-    
-    if is_cross_case_1 or is_cross_case_2:
-        num_exclusive_total = sum(1 for m in exclusive_mods)
-        num_desired_total = len(desired_prefixes) + len(desired_suffixes)
-        
-        if num_exclusive_total == 2 and num_desired_total == 2:
-            prob = 0.55
-            
-            if item1_base_desired or item2_base_desired:
-                return prob * 0.5, None 
-            else:
-                 return prob, None
-
-
-    # --- NORMAL EXCLUSIVE MOD SAYISI KONTROLÜ ---
-    if len(exclusive_mods) > 2:
-        return None, t['error_exclusive']
-
-    num_ex_desired = sum(1 for m in exclusive_mods if m['desired'])
-    if num_ex_desired > 1:
-        return None, t['error_exclusive']
-    
-    
-    # --- NORMAL HESAPLAMA ---
-    prefix_prob = calculate_modifier_probability(prefixes_item1, prefixes_item2, desired_prefixes, not_desired_prefixes, 
-                                                item1_base_desired, item2_base_desired)
-    suffix_prob = calculate_modifier_probability(suffixes_item1, suffixes_item2, desired_suffixes, not_desired_suffixes, 
-                                                item1_base_desired, item2_base_desired)
-    
-    total_prob = prefix_prob * suffix_prob
-    return total_prob, None
+    with metrics.stage('collect'):
+        scenario = Scenario.from_request(build_request_from_session())
+    prob, error_code = cached_result((scenario.mods, scenario.flags, scenario.base))
+    if error_code: return None, t[error_code]
+    return prob, None
+
+def what_if_rows():
+    # Tek bayrak değişiklikleri, en iyiden en kötüye.
+    t = translations[st.session_state.get('language_selector', 'English')]
+    rows = []
+    for v in sweep(build_request_from_session()).variants:
+        if v.field == 'base':
+            change = t['base_any'] if v.value == BASE_ANY else f"{t['base_item']} {v.value}"
+        else:
+            state = t['what_if_on'] if v.value else t['what_if_off']
+            change = f"{v.item}. {labels[v.slot]} ({v.mod}): {t[v.field]} {state}"
+        rows.append({
+            t['what_if_change']: change,
+            t['what_if_probability']: f"{v.probability * 100:.2f}%" if v.error_code is None else t[v.error_code],
+            t['what_if_delta']: f"{v.delta * 100:+.2f}%" if v.delta is not None else '',
+        })
+    return rows
 
 
 # -------------------------
@@ -340,57 +145,6 @@ col_lang, _ = st.columns([1, 5])
 with col_lang:
     language = st.selectbox("", ["English", "Turkish"], key="language_selector", label_visibility="collapsed")
 
-translations = {
-    "English": {
-        "title": "Recombinator Calculator",
-        "first_item": "First Item",
-        "second_item": "Second Item",
-        "desired_base": "Desired Final Base",
-        "calculate": "Calculate",
-        "probability": "Probability of getting desired affixes:",
-        "reset": "Reset",
-        "error_exclusive": "You can have at most 1 exclusive modifier on the final item (Except 1P/1S combination).",
-        "error_both_bases": "Cannot select both bases as desired",
-        "error_too_many_desired": "Please do not pick more than 3 unique prefixes/suffixes as desired",
-        "error_no_desired": "Please pick at least 1 desired modifier",
-        "error_pref_conflict": "Cannot select a modifier as both Desired and Not Desired",
-        "error_both_non_native": "Both items contain Non-Native Desired mods. Please select one as Desired Base manually, or remove one.",
-        "error_runtime": "A critical calculation error occurred.",
-        "error_non_native_manual": "One item contains Non-Native Desired mods. Please select the Base of the item containing the Non-Native mod as 'Desired Final Base' for a successful result.",
-        "exclusive": "Exclusive",
-        "non_native": "Non-Native",
-        "desired": "Desired",
-        "not_desired": "Not Desired",
-        "paste_item": "Paste Item",
-        "tooltip_paste": "Use Control + Alt + C when copying your item in game.",
-        "tooltip_type": "Exclusive: Only one allowed. Exception: 1 Ex Prefix + 1 Ex Suffix can give ~55% chance if they are the ONLY two mods. Non-Native: Mods drop if the base that cannot naturally roll them wins."
-    },
-    "Turkish": {
-        "title": "Recombinator Hesaplayıcısı",
-        "first_item": "İlk Item",
-        "second_item": "İkinci Item",
-        "desired_base": "İstediğiniz Final Base",
-        "calculate": "Hesapla",
-        "probability": "İstediğiniz affixlerin gelme olasılığı:",
-        "reset": "Sıfırla",
-        "error_exclusive": "Final itemde maksimum 1 adet exclusive modifier olabilir (1P/1S kombinasyonu hariç).",
-        "error_both_bases": "Her iki base'i de istediğiniz olarak seçemezsiniz",
-        "error_too_many_desired": "Lütfen 3'ten fazla farklı prefix/suffix'i istediğiniz olarak seçmeyin",
-        "error_no_desired": "Lütfen en az 1 adet istediğiniz modifier seçin",
-        "error_pref_conflict": "Bir modifier'ı hem İstiyorum hem de İstemiyorum olarak seçemezsiniz",
-        "error_both_non_native": "Her iki item de Non-Native İstediğiniz modlar içeriyor. Lütfen birini elle İstediğiniz Base olarak seçin veya birindeki modları kaldırın.",
-        "error_runtime": "Kritik bir hesaplama hatası oluştu.",
-        "error_non_native_manual": "Bir item Non-Native İstediğiniz modlar içeriyor. Başarılı bir sonuç için lütfen Non-Native mod içeren itemin Base'ini 'İstediğiniz Final Base' olarak seçin.",
-        "exclusive": "Exclusive",
-        "non_native": "Non-Native",
-        "desired": "İstiyorum",
-        "not_desired": "İstemiyorum",
-        "paste_item": "Item Yapıştır",
-        "tooltip_paste": "Oyun içindeki iteminizi kopyalarken Control + Alt + C kullanın.",
-        "tooltip_type": "Exclusive: Sadece bir tanesine izin verilir. İstisna: Eğer SADECE 1 Ex Prefix + 1 Ex Suffix varsa şans ~55%'e çıkarır. Non-Native: Modlar, onları doğal olarak rollayamayan base kazanırsa düşer."
-    }
-}
-
 t = translations[language]
 st.markdown(f"<h1>{t['title']}</h1>", unsafe_allow_html=True)
 
@@ -443,11 +197,12 @@ with col1:
         st.text_area(t["paste_item"] + " " + t["first_item"] + " " + "text here:", key="item1_paste_area", value=st.session_state.get('item1_paste_area',''), height=150)
         if st.button("Parse", key="parse_item1"):
             item_text = st.session_state.get('item1_paste_area', '')
-            prefixes, suffixes = parse_item_text(item_text)
+            prefixes, suffixes = cached_parse_item_text(item_text)
             for idx in range(6): st.session_state[f'item1_input_{idx}'] = ''
             for idx, prefix in enumerate(prefixes[:3]): st.session_state[f'item1_input_{idx}'] = prefix
             for idx, suffix in enumerate(suffixes[:3]): st.session_state[f'item1_input_{idx + 3}'] = suffix
             st.session_state['show_paste_item1'] = False
+            get_live_scenario().load(build_request_from_session())
             safe_rerun()
 
     # Render each affix row
@@ -459,20 +214,22 @@ with col1:
 
         # INPUT
         with input_col:
-            st.text_input(labels[i], key=f'item1_input_{i}', value=st.session_state.get(f'item1_input_{i}',''), label_visibility="visible")
+            st.text_input(labels[i], key=f'item1_input_{i}', value=st.session_state.get(f'item1_input_{i}',''), label_visibility="visible",
+                          on_change=handle_affix_change, args=(1, i, 'mod', f'item1_input_{i}'))
 
         # CHECKBOX STACK 1: Exclusive / Non-Native
         with check_stack_1:
             st.markdown('<div class="checkbox-stack">', unsafe_allow_html=True)
-            st.checkbox(t['exclusive'], key=f'item1_check_exclusive_{i}')
-            st.checkbox(t['non_native'], key=f'item1_check_non_native_{i}')
+            st.checkbox(t['exclusive'], key=f'item1_check_exclusive_{i}', on_change=handle_affix_change, args=(1, i, 'exclusive', f'item1_check_exclusive_{i}'))
+            st.checkbox(t['non_native'], key=f'item1_check_non_native_{i}', on_change=handle_affix_change, args=(1, i, 'non_native', f'item1_check_non_native_{i}'))
             st.markdown('</div>', unsafe_allow_html=True)
         
         # CHECKBOX STACK 2: Desired / Not Desired
         with check_stack_2:
             st.markdown('<div class="checkbox-stack">', unsafe_allow_html=True)
-            is_desired = st.checkbox(t['desired'], key=f'item1_check_desired_{i}')
-            st.checkbox(t['not_desired'], key=f'item1_check_not_desired_{i}', disabled=is_desired)
+            is_desired = st.checkbox(t['desired'], key=f'item1_check_desired_{i}', on_change=handle_affix_change, args=(1, i, 'desired', f'item1_check_desired_{i}'))
+            st.checkbox(t['not_desired'], key=f'item1_check_not_desired_{i}', disabled=is_desired,
+                        on_change=handle_affix_change, args=(1, i, 'not_desired', f'item1_check_not_desired_{i}'))
             st.markdown('</div>', unsafe_allow_html=True)
             
         st.markdown('</div>', unsafe_allow_html=True) 
@@ -501,11 +258,12 @@ with col2:
         st.text_area(t["paste_item"] + " " + t["second_item"] + " " + "text here:", key="item2_paste_area", value=st.session_state.get('item2_paste_area',''), height=150)
         if st.button("Parse", key="parse_item2"):
             item_text = st.session_state.get('item2_paste_area', '')
-            prefixes, suffixes = parse_item_text(item_text)
+            prefixes, suffixes = cached_parse_item_text(item_text)
             for idx in range(6): st.session_state[f'item2_input_{idx}'] = ''
             for idx, prefix in enumerate(prefixes[:3]): st.session_state[f'item2_input_{idx}'] = prefix
             for idx, suffix in enumerate(suffixes[:3]): st.session_state[f'item2_input_{idx + 3}'] = suffix
             st.session_state['show_paste_item2'] = False
+            get_live_scenario().load(build_request_from_session())
             safe_rerun()
 
     # Render each affix row
@@ -517,20 +275,22 @@ with col2:
 
         # INPUT
         with input_col:
-            st.text_input(labels[i], key=f'item2_input_{i}', value=st.session_state.get(f'item2_input_{i}',''), label_visibility="visible")
+            st.text_input(labels[i], key=f'item2_input_{i}', value=st.session_state.get(f'item2_input_{i}',''), label_visibility="visible",
+                          on_change=handle_affix_change, args=(2, i, 'mod', f'item2_input_{i}'))
 
         # CHECKBOX STACK 1: Exclusive / Non-Native
         with check_stack_1:
             st.markdown('<div class="checkbox-stack">', unsafe_allow_html=True)
-            st.checkbox(t['exclusive'], key=f'item2_check_exclusive_{i}')
-            st.checkbox(t['non_native'], key=f'item2_check_non_native_{i}')
+            st.checkbox(t['exclusive'], key=f'item2_check_exclusive_{i}', on_change=handle_affix_change, args=(2, i, 'exclusive', f'item2_check_exclusive_{i}'))
+            st.checkbox(t['non_native'], key=f'item2_check_non_native_{i}', on_change=handle_affix_change, args=(2, i, 'non_native', f'item2_check_non_native_{i}'))
             st.markdown('</div>', unsafe_allow_html=True)
         
         # CHECKBOX STACK 2: Desired / Not Desired
         with check_stack_2:
             st.markdown('<div class="checkbox-stack">', unsafe_allow_html=True)
-            is_desired = st.checkbox(t['desired'], key=f'item2_check_desired_{i}')
-            st.checkbox(t['not_desired'], key=f'item2_check_not_desired_{i}', disabled=is_desired)
+            is_desired = st.checkbox(t['desired'], key=f'item2_check_desired_{i}', on_change=handle_affix_change, args=(2, i, 'desired', f'item2_check_desired_{i}'))
+            st.checkbox(t['not_desired'], key=f'item2_check_not_desired_{i}', disabled=is_desired,
+                        on_change=handle_affix_change, args=(2, i, 'not_desired', f'item2_check_not_desired_{i}'))
             st.markdown('</div>', unsafe_allow_html=True)
 
         st.markdown('</div>', unsafe_allow_html=True) 
@@ -539,21 +299,34 @@ with col2:
 # Calculation & Result
 # -------------------------
 st.markdown("---")
-col_calc, col_reset = st.columns([4, 1])
+col_calc, col_what_if, col_live, col_reset = st.columns([3, 1, 1, 1])
+
+def format_result(prob, error):
+    # Otomatik Base seçimi (Non-Native) kontrolü kaldırıldığı için, sadece standart hataları işliyoruz.
+    if error:
+        return f'<p class="error-text">❌ {error}</p>'
+    elif prob is not None:
+        formatted_prob = f"{prob * 100:.2f}%"
+        return f'<p class="result-text">{t["probability"]} <b>{formatted_prob}</b></p>'
+    else:
+        return f'<p class="error-text">❌ {t["error_runtime"]}</p>'
 
 with col_calc:
     if st.button(t['calculate'], key="calculate_button"):
-        
         prob, error = calculate_combined_probability()
-        
-        # Otomatik Base seçimi (Non-Native) kontrolü kaldırıldığı için, sadece standart hataları işliyoruz.
-        if error:
-            st.session_state['result_text'] = f'<p class="error-text">❌ {error}</p>'
-        elif prob is not None:
-            formatted_prob = f"{prob * 100:.2f}%"
-            st.session_state['result_text'] = f'<p class="result-text">{t["probability"]} <b>{formatted_prob}</b></p>'
-        else:
-            st.session_state['result_text'] = f'<p class="error-text">❌ {t["error_runtime"]}</p>'
+        st.session_state['result_text'] = format_result(prob, error)
+
+with col_what_if:
+    if st.button(t['what_if'], key="what_if_button"):
+        st.session_state['what_if_rows'] = what_if_rows()
+
+with col_live:
+    live_update = st.checkbox(t['live_update'], key="live_update")
+
+if live_update:
+    # Canlı mod: sonuç her etkileşimde, sadece değişen taraf yeniden hesaplanarak güncellenir.
+    prob, error_code = get_live_scenario().result()
+    st.session_state['result_text'] = format_result(prob, t[error_code] if error_code else None)
             
 with col_reset:
     if st.button(t['reset'], key="reset_button"):
@@ -563,4 +336,6 @@ with col_reset:
         st.session_state['result_text'] = ''
         safe_rerun()
 
-st.markdown(st.session_state.get('result_text', ''), unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(st.session_state.get('result_text', ''), unsafe_allow_html=True)
+if st.session_state.get('what_if_rows'):
+    st.dataframe(st.session_state['what_if_rows'], hide_index=True, use_container_width=True)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Columnar batch evaluation of recombination scenarios.
+
+Each scenario is one row. Affix columns have 12 slots per row:
+
+    0-2  item 1 prefixes     3-5  item 1 suffixes
+    6-8  item 2 prefixes     9-11 item 2 suffixes
+
+`mod_ids` holds an integer mod id per slot (0 = empty slot) and the four flag
+columns hold a truthy value per slot. `base` holds one BASE_* value per row.
+Columns may be NumPy arrays or plain nested sequences.
+
+Rows are packed straight into `engine.Scenario` objects, and rows that share
+a prefix-side or suffix-side sub-problem reuse the cached side probability,
+since the final result is `prefix_prob * suffix_prob`. Callers that already
+hold packed rows (the HTTP service) use `evaluate_scenarios` directly.
+"""
+from array import array
+
+from engine import DESIRED, EXCLUSIVE, NON_NATIVE, NOT_DESIRED, SLOTS, Scenario, evaluate_scenario
+
+
+class BatchResult:
+    __slots__ = ('probabilities', 'errors')
+
+    def __init__(self, probabilities, errors):
+        # probabilities: array('d'), NaN where the row produced an error code
+        self.probabilities = probabilities
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def results(self):
+        """(probability, error_code) per row, as engine.evaluate returns them."""
+        return [(None, error_code) if error_code else (prob, None)
+                for prob, error_code in zip(self.probabilities, self.errors)]
+
+
+def _rows(column):
+    return column.tolist() if hasattr(column, 'tolist') else column
+
+def _pack_row(mod_row, exclusive_row, non_native_row, desired_row, not_desired_row, base):
+    mods = tuple(int(mod) for mod in mod_row)
+    flags = 0
+    for slot in range(SLOTS):
+        if not mods[slot]: continue
+        bit = 1 << slot
+        if exclusive_row[slot]: flags |= bit << EXCLUSIVE
+        if non_native_row[slot]: flags |= bit << NON_NATIVE
+        if desired_row[slot]: flags |= bit << DESIRED
+        if not_desired_row[slot]: flags |= bit << NOT_DESIRED
+    return Scenario(mods, flags, int(base))
+
+def evaluate_batch(mod_ids, exclusive, non_native, desired, not_desired, base, side_cache=None, rules=None):
+    """Evaluate every row and return a BatchResult.
+
+    `side_cache` may be passed in to keep sharing side results across calls;
+    by default a fresh dict lives for the duration of the batch. `rules`
+    selects the ruleset (see engine.evaluate).
+    """
+    mod_ids, exclusive, non_native = _rows(mod_ids), _rows(exclusive), _rows(non_native)
+    desired, not_desired, base = _rows(desired), _rows(not_desired), _rows(base)
+    scenarios = [_pack_row(mod_ids[row], exclusive[row], non_native[row], desired[row], not_desired[row], base[row])
+                 for row in range(len(mod_ids))]
+    return evaluate_scenarios(scenarios, side_cache, rules)
+
+def evaluate_scenarios(scenarios, side_cache=None, rules=None):
+    """evaluate_batch for rows already packed as engine.Scenario objects."""
+    if side_cache is None: side_cache = {}
+    n = len(scenarios)
+    probabilities = array('d', bytes(8 * n))
+    errors = [None] * n
+    nan = float('nan')
+    for row, scenario in enumerate(scenarios):
+        prob, error_code = evaluate_scenario(scenario, side_cache, rules=rules)
+        if error_code:
+            probabilities[row] = nan
+            errors[row] = error_code
+        else:
+            probabilities[row] = prob
+    return BatchResult(probabilities, errors)
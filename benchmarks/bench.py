@@ -0,0 +1,202 @@
+"""Benchmark harness for the calculation hot paths.
+
+Runs every benchmark over the corpora in `benchmarks.corpora` and reports
+per-call latency percentiles, throughput and peak traced memory, plus the
+cold start time of the entry points in a fresh interpreter. Results are
+written as JSON and compared against a stored baseline; a benchmark whose
+p50 latency grew by more than `--threshold` is reported as a regression and
+the process exits with status 1. A baseline recorded with a different
+`--quick` setting is not compared.
+
+    python -m benchmarks.bench                       # run, write results, compare
+    python -m benchmarks.bench --save-baseline       # store this run as the baseline
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from batch import evaluate_batch
+from benchmarks import corpora
+from engine import (calculate_modifier_probability, calculate_selection_probability, canonical_side_key, evaluate,
+                    exact_probability_from_key, parse_item_text, probability_from_key)
+from stash_parser import iter_items
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(HERE, 'results.json')
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def measure(func, calls, repeat=3, trace_memory=True):
+    """Time func(*args) for each args tuple in `calls`; return latency stats in microseconds."""
+    timings = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for _ in range(repeat):
+        for args in calls:
+            t0 = clock()
+            func(*args)
+            timings.append(clock() - t0)
+    elapsed = (clock() - start) / 1e9
+    timings.sort()
+    stats = {'calls': len(timings), 'p50_us': _percentile(timings, 0.50) / 1e3,
+             'p90_us': _percentile(timings, 0.90) / 1e3, 'p99_us': _percentile(timings, 0.99) / 1e3,
+             'throughput_per_s': len(timings) / elapsed}
+    if not trace_memory: return stats
+
+    tracemalloc.start()
+    for args in calls: func(*args)
+    stats['peak_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return stats
+
+def measure_bulk(func, units, repeat=3):
+    """Time one call that processes `units` items; latency is reported per unit."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    per_unit = best / units * 1e6
+    return {'calls': units, 'p50_us': per_unit, 'p90_us': per_unit, 'p99_us': per_unit,
+            'throughput_per_s': units / best, 'peak_kib': peak / 1024}
+
+
+# Cold start: a fresh interpreter per run, so nothing is imported or cached yet.
+SCENARIO_JSON = ('{"item1": [{"mod": "Life", "desired": true}], '
+                 '"item2": [{"mod": "Speed", "type": "suffix", "desired": true}]}')
+STARTUP = {
+    'python': ['-c', 'pass'],
+    'import_engine': ['-c', 'import engine'],
+    'cli': ['cli.py'],
+    'import_service': ['-c', 'import service'],
+    'import_ui': ['-c', 'import streamlit, Recombinator'],
+}
+
+def measure_startup(args, runs):
+    """Wall time of `python <args>` from process start to exit, with a scenario on stdin.
+
+    No peak memory: tracemalloc only sees this process, not the child interpreter."""
+    def run():
+        subprocess.run([sys.executable, *args], input=SCENARIO_JSON, text=True, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return measure(run, [()] * runs, repeat=1, trace_memory=False)
+
+def _batch_columns(requests):
+    ids, columns = {}, {k: [] for k in ('mod_ids', 'exclusive', 'non_native', 'desired', 'not_desired')}
+    for request in requests:
+        row = {k: [0] * 12 if k == 'mod_ids' else [False] * 12 for k in columns}
+        for offset, affixes in ((0, request.item1), (6, request.item2)):
+            used = {'prefix': 0, 'suffix': 3}
+            for affix in affixes:
+                slot = offset + used[affix.type]
+                used[affix.type] += 1
+                row['mod_ids'][slot] = ids.setdefault(affix.mod, len(ids) + 1)
+                for flag in ('exclusive', 'non_native', 'desired', 'not_desired'):
+                    row[flag][slot] = getattr(affix, flag)
+        for k in columns: columns[k].append(row[k])
+    columns['base'] = [request.base for request in requests]
+    return columns
+
+def run_all(quick=False):
+    size = 300 if quick else 2000
+    results = {}
+    for name, make in corpora.SCENARIO_CORPORA.items():
+        requests = make(size)
+        sides = corpora.side_arguments(requests)
+        selection_calls = [(mods1 + mods2, desired, not_desired, outcome, base)
+                           for mods1, mods2, desired, not_desired, _, _ in sides
+                           for outcome in (1, 2, 3) for base in (1, 2)]
+        results[f'selection_probability/{name}'] = measure(calculate_selection_probability, selection_calls)
+        results[f'modifier_probability/{name}'] = measure(calculate_modifier_probability, sides)
+        results[f'evaluate/{name}'] = measure(evaluate, [(r,) for r in requests])
+        results[f'evaluate_exact/{name}'] = measure(lambda r: evaluate(r, exact=True), [(r,) for r in requests])
+        # Uncached key paths: the exact mode should stay within a small factor of the float one.
+        keys = sorted({(canonical_side_key(*side[:4], base),) for side in sides for base in (0, 1, 2)} - {(None,)})
+        results[f'probability_from_key/{name}'] = measure(probability_from_key.__wrapped__, keys)
+        results[f'exact_probability_from_key/{name}'] = measure(exact_probability_from_key.__wrapped__, keys)
+        columns = _batch_columns(requests)
+        results[f'evaluate_batch/{name}'] = measure_bulk(lambda: evaluate_batch(**columns), len(requests))
+
+    dump_items = 2000 if quick else 20000
+    dump = corpora.stash_dump(dump_items)
+    single_items = [(corpora.item_text(random.Random(i), i),) for i in range(size)]
+    results['parse_item_text/single'] = measure(parse_item_text, single_items)
+    results['stash_parser/dump'] = measure_bulk(lambda: sum(1 for _ in iter_items(io.StringIO(dump))), dump_items)
+
+    for name, args in STARTUP.items():
+        try:
+            results[f'startup/{name}'] = measure_startup(args, 3 if quick else 10)
+        except subprocess.CalledProcessError:     # e.g. streamlit is not installed
+            pass
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous: continue
+        change = current['p50_us'] / previous['p50_us'] - 1 if previous['p50_us'] else 0.0
+        current['p50_change'] = change
+        if change > threshold: regressions.append((name, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the recombinator calculation hot paths.')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write this run to the baseline path')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed p50 slowdown before flagging')
+    parser.add_argument('--quick', action='store_true', help='smaller corpora for a fast smoke run')
+    args = parser.parse_args(argv)
+
+    results = run_all(args.quick)
+    report = {'python': sys.version.split()[0], 'platform': platform.platform(), 'quick': args.quick,
+              'results': results}
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Quick runs use smaller corpora; their latencies are not comparable with a full run.
+        if baseline.get('quick') != args.quick:
+            print(f"baseline {args.baseline} is a {'quick' if baseline.get('quick') else 'full'} run, "
+                  f"this is a {'quick' if args.quick else 'full'} run: not comparing")
+        else:
+            regressions = compare(results, baseline, args.threshold)
+
+    print(f"{'benchmark':36s} {'p50 us':>9s} {'p90 us':>9s} {'p99 us':>9s} {'ops/s':>11s} {'peak KiB':>9s} {'vs base':>8s}")
+    for name, r in results.items():
+        change = f"{r['p50_change']:+.0%}" if 'p50_change' in r else ''
+        peak = f"{r['peak_kib']:9.1f}" if 'peak_kib' in r else f"{'-':>9s}"
+        print(f"{name:36s} {r['p50_us']:9.2f} {r['p90_us']:9.2f} {r['p99_us']:9.2f} "
+              f"{r['throughput_per_s']:11,.0f} {peak} {change:>8s}")
+
+    path = args.baseline if args.save_baseline else args.output
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'results written to {path}')
+
+    for name, change in regressions:
+        print(f'REGRESSION {name}: p50 {change:+.0%}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
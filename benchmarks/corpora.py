@@ -0,0 +1,69 @@
+"""Representative scenario corpora for the benchmarks.
+
+Every corpus is generated from a fixed seed so runs are comparable.
+"""
+import random
+
+from engine import BASE_ANY, BASE_ITEM1, BASE_ITEM2, PREFIX, SUFFIX, Affix, RecombinationRequest, request_sides
+
+PREFIX_POOL = ['+# to maximum Life', '+# to maximum Mana', '#% increased Armour', '#% increased Evasion Rating',
+               'Adds # to # Physical Damage', '#% increased Spell Damage']
+SUFFIX_POOL = ['+#% to Fire Resistance', '+#% to Cold Resistance', '#% increased Attack Speed',
+               '+# to Dexterity', '+# to Strength', '#% increased Critical Hit Chance']
+
+
+def _item(rng, n_prefixes, n_suffixes, desired_rate, non_native_rate=0.0, exclusive_rate=0.0):
+    affixes = []
+    for mod_type, pool, count in ((PREFIX, PREFIX_POOL, n_prefixes), (SUFFIX, SUFFIX_POOL, n_suffixes)):
+        for mod in rng.sample(pool, count):
+            desired = rng.random() < desired_rate
+            affixes.append(Affix(mod, mod_type, exclusive=rng.random() < exclusive_rate,
+                                 non_native=rng.random() < non_native_rate, desired=desired,
+                                 not_desired=not desired and rng.random() < 0.2))
+    return tuple(affixes)
+
+def sparse(n=2000, seed=1):
+    rng = random.Random(seed)
+    return [RecombinationRequest(_item(rng, 1, rng.randint(0, 1), 0.7), _item(rng, rng.randint(0, 1), 1, 0.7))
+            for _ in range(n)]
+
+def full(n=2000, seed=2):
+    rng = random.Random(seed)
+    return [RecombinationRequest(_item(rng, 3, 3, 0.3), _item(rng, 3, 3, 0.3), rng.choice((BASE_ANY, BASE_ITEM1)))
+            for _ in range(n)]
+
+def non_native(n=2000, seed=3):
+    rng = random.Random(seed)
+    return [RecombinationRequest(_item(rng, 2, 2, 0.4, non_native_rate=0.4), _item(rng, 2, 2, 0.4),
+                                 rng.choice((BASE_ITEM1, BASE_ITEM2)))
+            for _ in range(n)]
+
+def exclusive(n=2000, seed=4):
+    rng = random.Random(seed)
+    return [RecombinationRequest(_item(rng, 2, 2, 0.4, exclusive_rate=0.3), _item(rng, 2, 2, 0.4, exclusive_rate=0.3))
+            for _ in range(n)]
+
+SCENARIO_CORPORA = {'sparse': sparse, 'full': full, 'non_native': non_native, 'exclusive': exclusive}
+
+def side_arguments(requests):
+    """calculate_modifier_probability argument tuples for every side of `requests`."""
+    args = []
+    for request in requests:
+        s = request_sides(request)
+        for side in ('prefixes', 'suffixes'):
+            args.append((s[f'{side}_item1'], s[f'{side}_item2'], s[f'desired_{side}'], s[f'not_desired_{side}'],
+                         request.base == BASE_ITEM1, request.base == BASE_ITEM2))
+    return args
+
+def item_text(rng, index):
+    lines = ['Item Class: Rings', 'Rarity: Rare', f'Ring {index}', 'Ruby Ring', '--------', 'Item Level: 80', '--------']
+    for kind, pool in (('Prefix', PREFIX_POOL), ('Suffix', SUFFIX_POOL)):
+        for mod in rng.sample(pool, rng.randint(1, 3)):
+            tier = rng.randint(1, 9)
+            lines.append(f'{{ {kind} Modifier "Name" (Tier: {tier}) }}')
+            lines.append(mod.replace('#', f'{rng.randint(10, 40)}({rng.randint(5, 9)}–{rng.randint(41, 60)})'))
+    return '\n'.join(lines) + '\n'
+
+def stash_dump(n=20000, seed=5):
+    rng = random.Random(seed)
+    return ''.join(item_text(rng, i) for i in range(n))
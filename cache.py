@@ -0,0 +1,58 @@
+"""Bounded memoization of side probabilities.
+
+`LRUCache` is keyed by `engine.canonical_side_key`, so structurally identical
+sides ("desired Life + desired Resist + one filler") share one entry no matter
+which mod names they use. Pass it as `side_cache` to `engine.evaluate` or
+`batch.evaluate_batch`, or call `modifier_probability` directly.
+"""
+from collections import OrderedDict
+
+from engine import BASE_ANY, BASE_ITEM1, BASE_ITEM2, side_probability
+
+
+class LRUCache:
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'size': len(self.data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+default_cache = LRUCache()
+
+def modifier_probability(mods_item1, mods_item2, desired_mods, not_desired_mods, item1_base_desired,
+                         item2_base_desired, cache=default_cache):
+    """Drop-in for engine.calculate_modifier_probability that goes through `cache`."""
+    base = BASE_ITEM1 if item1_base_desired else BASE_ITEM2 if item2_base_desired else BASE_ANY
+    return side_probability(mods_item1, mods_item2, desired_mods, not_desired_mods, base, cache)
@@ -0,0 +1,74 @@
+"""Lean command-line entry point: evaluate scenarios without the UI.
+
+    python cli.py scenarios.json            # one scenario, a JSON list, or JSON lines
+    python cli.py scenarios.json --store results.rcs   # share computed sides on disk (see store.py)
+    echo '{"item1": [...], "item2": [...]}' | python cli.py --lang Turkish
+
+Scenarios use the HTTP service schema (see `service.py`); one JSON result
+per scenario is printed per line, in the service's format (`responses.py`).
+A scenario that is not valid JSON or not a valid request gets an
+`invalid_request` result and the others are still evaluated; an unknown
+`--rules` version is a usage error. Only the engine is imported at startup,
+so short-lived batch jobs and workers start in tens of milliseconds; the
+translations are loaded the first time an error message is needed.
+"""
+import argparse
+import json
+import sys
+
+from engine import evaluate, request_from_dict
+from responses import ERROR_INVALID_REQUEST, error_body, result_body
+
+
+def read_scenarios(text):
+    """Scenario dicts from one JSON value (object or list) or from JSON lines.
+    A line that is not valid JSON comes back as its json.JSONDecodeError."""
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        scenarios = []
+        for line in text.splitlines():
+            if not line.strip(): continue
+            try:
+                scenarios.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                scenarios.append(exc)
+        return scenarios
+    return payload if isinstance(payload, list) else [payload]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evaluate recombination scenarios given as JSON.')
+    parser.add_argument('path', nargs='?', help='JSON file (default: stdin)')
+    parser.add_argument('--lang', default='English', help='language of error messages')
+    parser.add_argument('--rules', help='ruleset version from rulesets/ (default v1)')
+    parser.add_argument('--store', help='persistent result store to read and extend (see store.py)')
+    args = parser.parse_args(argv)
+
+    rules = None
+    if args.rules:
+        from rules import get_rules
+        try:
+            rules = get_rules(args.rules)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.path:
+        with open(args.path, encoding='utf-8') as f: text = f.read()
+    else:
+        text = sys.stdin.read()
+
+    side_cache = {}
+    if args.store:
+        from store import ResultStore
+        side_cache = ResultStore(args.store)
+    for obj in read_scenarios(text):
+        try:
+            if isinstance(obj, ValueError): raise obj
+            body = result_body(evaluate(request_from_dict(obj), side_cache, rules=rules), args.lang)
+        except ValueError as exc:
+            body = error_body(ERROR_INVALID_REQUEST, args.lang, str(exc))
+        print(json.dumps(body))
+
+
+if __name__ == '__main__':
+    main()
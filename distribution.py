@@ -0,0 +1,92 @@
+"""Full outcome distribution of a recombination.
+
+Instead of the chance that one desired set appears, `outcome_distribution`
+returns every possible result with its probability in one pass:
+
+    {(prefix outcome, suffix outcome): probability}
+    outcome = (winning base, frozenset of mods, short)
+
+It is the engine's side model under `rules` (default: DEFAULT_RULES), laid
+out as outcomes, so sums over it reproduce `engine.evaluate`:
+
+* each side draws its own winning base, 1 or 2 with probability
+  `rules.base_weight` each (the engine applies the base factor per side);
+* non-native mods of the losing item (if the ruleset drops them) and Not
+  Desired mods leave that side's pool;
+* the number of mods comes from `get_count_probabilities` and that many
+  distinct mods are drawn uniformly from the pool. An empty draw is stored
+  with base BASE_ANY: the engine counts it whatever base is desired;
+* when the pool holds fewer mods than the drawn count the outcome is the
+  whole pool with `short` set. The engine counts such an outcome only for a
+  query asking for exactly that set (the calculator's "all selectable mods
+  are desired" rule); any other query fails on it.
+
+`probability_of(distribution, desired prefixes, desired suffixes, base)`
+equals `engine.evaluate` for every scenario the engine does not decide by a
+special rule: validation errors, the 0.55 cross case, the non-native zero
+and a mod marked Desired on one slot and Not Desired on another. Questions
+like "Life or Mana, with base 1" then become a sum over one distribution
+(`probability_where`) instead of one evaluation per combination.
+"""
+from itertools import combinations
+from math import comb
+
+from engine import BASE_ANY, get_count_probabilities, request_sides
+from rules import DEFAULT_RULES
+
+
+def _pool(mods_item1, mods_item2, not_desired_mods, winning_base, rules=DEFAULT_RULES):
+    pool = {}
+    for mod_info in mods_item1 + mods_item2:
+        # Non-Native kuralı: onu taşımayan base kazanırsa düşer.
+        if mod_info['non_native'] and mod_info['item'] != winning_base and rules.non_native_drops: continue
+        if mod_info['mod'] not in not_desired_mods: pool[mod_info['mod']] = True
+    return sorted(pool)
+
+def side_distribution(mods_item1, mods_item2, not_desired_mods, rules=None):
+    """{(winning base, frozenset of mods, short): probability} for one side, base weight included."""
+    if rules is None: rules = DEFAULT_RULES
+    count_probs = get_count_probabilities(len(mods_item1) + len(mods_item2), rules)
+    distribution = {}
+    for outcome_count, count_prob in count_probs.items():
+        if outcome_count == 0:
+            # Hiç mod çıkmazsa base önemsiz: hesap makinesi bu durumu base faktörü olmadan sayar.
+            key = (BASE_ANY, frozenset(), False)
+            distribution[key] = distribution.get(key, 0.0) + count_prob
+            continue
+        for base in (1, 2):
+            pool = _pool(mods_item1, mods_item2, not_desired_mods, base, rules)
+            if len(pool) < outcome_count:
+                key = (base, frozenset(pool), True)
+                distribution[key] = distribution.get(key, 0.0) + rules.base_weight * count_prob
+                continue
+            weight = rules.base_weight * count_prob / comb(len(pool), outcome_count)
+            for chosen in combinations(pool, outcome_count):
+                key = (base, frozenset(chosen), False)
+                distribution[key] = distribution.get(key, 0.0) + weight
+    return distribution
+
+def outcome_distribution(request, rules=None):
+    """{(prefix outcome, suffix outcome): probability} for a RecombinationRequest; the sides are independent."""
+    if rules is None: rules = DEFAULT_RULES
+    s = request_sides(request)
+    prefixes = side_distribution(s['prefixes_item1'], s['prefixes_item2'], s['not_desired_prefixes'], rules)
+    suffixes = side_distribution(s['suffixes_item1'], s['suffixes_item2'], s['not_desired_suffixes'], rules)
+    return {(prefix, suffix): prefix_prob * suffix_prob
+            for prefix, prefix_prob in prefixes.items() for suffix, suffix_prob in suffixes.items()}
+
+def side_matches(outcome, mods, base=BASE_ANY):
+    """True when one side outcome counts as holding `mods` (a frozenset) on `base`, as the engine counts it."""
+    side_base, side_mods, short = outcome
+    if base != BASE_ANY and side_base not in (BASE_ANY, base): return False
+    return mods == side_mods if short else mods <= side_mods
+
+def probability_where(distribution, predicate):
+    """Total probability of the outcomes for which predicate(key) is true."""
+    return sum(prob for key, prob in distribution.items() if predicate(key))
+
+def probability_of(distribution, prefixes=(), suffixes=(), base=BASE_ANY):
+    """Chance that the result has all of `prefixes` and `suffixes` (with both sides on `base`, if set)."""
+    prefixes, suffixes = frozenset(prefixes), frozenset(suffixes)
+    return probability_where(distribution, lambda key: side_matches(key[0], prefixes, base)
+                             and side_matches(key[1], suffixes, base))
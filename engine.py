@@ -0,0 +1,617 @@
+"""Headless recombination engine.
+
+Pure-Python probability functions behind the Streamlit calculator. Importing
+this module must stay cheap: no Streamlit, no UI state, no translations.
+Errors are reported as stable codes (the keys used in the UI `translations`).
+"""
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from math import comb
+
+from registry import default_registry
+from rules import DEFAULT_RULES, RULES_SHIFT, rules_by_id
+
+PREFIX = 'prefix'
+SUFFIX = 'suffix'
+
+# Base choice: 0 = no desired base, 1 = first item's base, 2 = second item's base
+BASE_ANY = 0
+BASE_ITEM1 = 1
+BASE_ITEM2 = 2
+
+ERROR_EXCLUSIVE = 'error_exclusive'
+ERROR_TOO_MANY_DESIRED = 'error_too_many_desired'
+ERROR_NO_DESIRED = 'error_no_desired'
+ERROR_PREF_CONFLICT = 'error_pref_conflict'
+ERROR_BOTH_NON_NATIVE = 'error_both_non_native'
+ERROR_NON_NATIVE_MANUAL = 'error_non_native_manual'
+
+
+# -------------------------
+# Request types
+# -------------------------
+@dataclass(frozen=True)
+class Affix:
+    mod: str
+    type: str = PREFIX
+    exclusive: bool = False
+    non_native: bool = False
+    desired: bool = False
+    not_desired: bool = False
+
+
+@dataclass(frozen=True)
+class RecombinationRequest:
+    item1: tuple = ()
+    item2: tuple = ()
+    base: int = BASE_ANY
+
+
+AFFIX_FLAGS = ('exclusive', 'non_native', 'desired', 'not_desired')
+
+def request_from_dict(obj):
+    """Build a RecombinationRequest from decoded JSON (the service/CLI schema); raises ValueError on bad input."""
+    if not isinstance(obj, dict): raise ValueError('scenario must be an object')
+    items = []
+    for name in ('item1', 'item2'):
+        affixes = obj.get(name, [])
+        if not isinstance(affixes, list) or len(affixes) > 6:
+            raise ValueError(f'{name} must be a list of at most 6 affixes')
+        parsed = []
+        for affix in affixes:
+            if not isinstance(affix, dict) or not isinstance(affix.get('mod'), str):
+                raise ValueError(f'{name} affixes need a string "mod"')
+            mod_type = affix.get('type', PREFIX)
+            if mod_type not in (PREFIX, SUFFIX): raise ValueError(f'unknown affix type {mod_type!r}')
+            parsed.append(Affix(affix['mod'], mod_type, **{flag: bool(affix.get(flag, False)) for flag in AFFIX_FLAGS}))
+        if sum(1 for a in parsed if a.type == PREFIX) > 3 or sum(1 for a in parsed if a.type == SUFFIX) > 3:
+            raise ValueError(f'{name} can have at most 3 prefixes and 3 suffixes')
+        items.append(tuple(parsed))
+    base = obj.get('base', BASE_ANY)
+    # type() check: 1.0 and True compare equal to 1 but break the bit packing.
+    if type(base) is not int or base not in (BASE_ANY, BASE_ITEM1, BASE_ITEM2): raise ValueError('base must be 0, 1 or 2')
+    return RecombinationRequest(items[0], items[1], base)
+
+
+# -------------------------
+# Calculation functions
+# -------------------------
+def get_count_probabilities(count, rules=None):
+    # Dağılımlar rulesets/*.json dosyalarından gelir (varsayılan: v1).
+    count_probabilities = (rules or DEFAULT_RULES).count_probabilities
+    if not 0 <= count < len(count_probabilities): return {}
+    return dict(count_probabilities[count])
+
+def calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, winning_base, rules=None):
+    non_native_drops = (rules or DEFAULT_RULES).non_native_drops
+    available_mods = []
+    for mod_info in all_mods_list:
+        # Non-Native kuralı: Non-Native modlar, onu taşımayan base kazanırsa düşer.
+        if mod_info['non_native'] and mod_info['item'] != winning_base and non_native_drops:
+            continue
+        available_mods.append(mod_info['mod'])
+
+    selectable_mods_pool = list(set(available_mods))
+
+    # İstenen modların hepsi havuzda olmalı
+    for desired in desired_mods:
+        if desired not in selectable_mods_pool: return 0.0
+
+    selectable_mods = [m for m in selectable_mods_pool if m not in not_desired_mods]
+
+    if len(desired_mods) > outcome_count: return 0.0
+
+    non_desired_selectable = [m for m in selectable_mods if m not in desired_mods]
+    total_unique_selectable = len(desired_mods) + len(non_desired_selectable)
+
+    if total_unique_selectable < outcome_count:
+        if len(desired_mods) == total_unique_selectable: return 1.0
+        else:
+             if outcome_count > total_unique_selectable and outcome_count > 3: return 0.0
+
+    if len(selectable_mods) < outcome_count: return 0.0
+
+    filled_slots = len(desired_mods)
+    remaining_slots = outcome_count - filled_slots
+
+    if remaining_slots < 0: return 0.0
+    if remaining_slots > len(non_desired_selectable): return 0.0
+
+    favorable_combinations = comb(len(non_desired_selectable), remaining_slots)
+    total_combinations = comb(len(selectable_mods), outcome_count)
+
+    if total_combinations == 0: return 0.0
+
+    return favorable_combinations / total_combinations
+
+def calculate_modifier_probability(mods_item1, mods_item2, desired_mods, not_desired_mods, item1_base_desired, item2_base_desired, rules=None):
+
+    all_mods_list = mods_item1 + mods_item2
+    total_mod_count = len(all_mods_list)
+
+    if total_mod_count == 0: return 0.0 if len(desired_mods) > 0 else 1.0
+
+    count_probs = get_count_probabilities(total_mod_count, rules)
+    base_weight = (rules or DEFAULT_RULES).base_weight
+    total_prob = 0.0
+
+    for outcome_count, count_prob in count_probs.items():
+        if outcome_count == 0:
+            if len(desired_mods) == 0: total_prob += count_prob
+            continue
+
+        if len(desired_mods) > outcome_count: continue
+
+        # Base'e göre mod başarı olasılıklarını hesapla
+        prob_base1_affix = calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, 1, rules)
+        prob_base2_affix = calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, 2, rules)
+
+        # Base Seçimi Faktörü
+        if not item1_base_desired and not item2_base_desired:
+             # Base seçili değilse: (P(Base 1) * P(Affix | B1)) + (P(Base 2) * P(Affix | B2))
+             selection_prob = (prob_base1_affix * base_weight) + (prob_base2_affix * base_weight)
+
+        elif item1_base_desired:
+             # Base 1 isteniyor: Olasılık yarıya iner (sizin istediğiniz kurala göre).
+             selection_prob = prob_base1_affix * base_weight
+        elif item2_base_desired:
+             # Base 2 isteniyor: Olasılık yarıya iner.
+             selection_prob = prob_base2_affix * base_weight
+        else:
+             selection_prob = 0.0
+
+
+        total_prob += count_prob * selection_prob
+
+    return total_prob
+
+def parse_item_text(item_text):
+    lines = item_text.strip().split('\n')
+    prefixes = []
+    suffixes = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if 'Prefix Modifier' in line:
+            if i + 1 < len(lines):
+                mod_line = lines[i + 1].strip()
+                mod_clean = re.sub(r'\s*T\d+\s*', '', mod_line)
+                mod_clean = re.sub(r'\s*\(\d+–\d+\)', '', mod_clean)
+                prefixes.append(mod_clean)
+                i += 1
+        elif 'Suffix Modifier' in line:
+            if i + 1 < len(lines):
+                mod_line = lines[i + 1].strip()
+                mod_clean = re.sub(r'\s*T\d+\s*', '', mod_line)
+                mod_clean = re.sub(r'\s*\(\d+–\d+\)', '', mod_clean)
+                suffixes.append(mod_clean)
+                i += 1
+        i += 1
+    return prefixes, suffixes
+
+
+# -------------------------
+# Request evaluation
+# -------------------------
+def request_sides(request):
+    """Per-side mod lists and desired / not desired sets of a request, in calculate_modifier_probability's form.
+
+    Keys: prefixes_item1, prefixes_item2, suffixes_item1, suffixes_item2 (lists of mod
+    dicts), desired_prefixes, desired_suffixes, not_desired_prefixes, not_desired_suffixes.
+    """
+    sides = {'prefixes_item1': [], 'prefixes_item2': [], 'suffixes_item1': [], 'suffixes_item2': [],
+             'desired_prefixes': set(), 'desired_suffixes': set(),
+             'not_desired_prefixes': set(), 'not_desired_suffixes': set()}
+    for item_num, affixes in ((1, request.item1), (2, request.item2)):
+        for affix in affixes:
+            mod = affix.mod.strip()
+            if not mod: continue
+            side = 'prefixes' if affix.type == PREFIX else 'suffixes'
+            mod_info = {'mod': mod, 'non_native': affix.non_native, 'exclusive': affix.exclusive,
+                        'item': item_num, 'desired': affix.desired, 'type': affix.type}
+            sides[f'{side}_item{item_num}'].append(mod_info)
+            if affix.desired: sides[f'desired_{side}'].add(mod)
+            elif affix.not_desired: sides[f'not_desired_{side}'].add(mod)
+    return sides
+
+# Availability classes of a distinct mod on one side, used by canonical keys.
+ALWAYS = 0        # has a native instance (or non-native instances on both items)
+ITEM1_ONLY = 1    # only non-native instances on item 1
+ITEM2_ONLY = 2    # only non-native instances on item 2
+SIDE_KEY_TYPES = 12   # availability class x desired x not desired
+MAX_SIDE_MODS = 6
+
+def canonical_side_key(mods_item1, mods_item2, desired_mods, not_desired_mods, base, rules=None):
+    """Pack a side sub-problem into an int that ignores mod identity.
+
+    The key holds the mod instance count, the base choice and, for each of the
+    12 (availability, desired, not desired) types, how many distinct mods have
+    that type, plus the ruleset's key_id from bit RULES_SHIFT up. Two sides
+    with equal keys have equal probabilities. Returns None for sides the key
+    cannot describe (more than 6 instances, or desired mods missing from the
+    side).
+    """
+    total_mod_count = len(mods_item1) + len(mods_item2)
+    if total_mod_count > MAX_SIDE_MODS: return None
+    if rules is None: rules = DEFAULT_RULES
+    drops = rules.non_native_drops
+
+    classes = {}
+    for mod_info in mods_item1:
+        mod = mod_info['mod']
+        if not (mod_info['non_native'] and drops): classes[mod] = ALWAYS
+        elif classes.get(mod, ITEM1_ONLY) != ALWAYS: classes[mod] = ITEM1_ONLY
+    for mod_info in mods_item2:
+        mod = mod_info['mod']
+        if not (mod_info['non_native'] and drops) or classes.get(mod, ITEM2_ONLY) != ITEM2_ONLY: classes[mod] = ALWAYS
+        else: classes[mod] = ITEM2_ONLY
+
+    for mod in desired_mods:
+        if mod not in classes: return None
+
+    key = total_mod_count | (base << 3) | rules.key_bits
+    for mod, availability in classes.items():
+        key += 1 << (5 + 3 * (availability * 4 + (mod in desired_mods) * 2 + (mod in not_desired_mods)))
+    return key
+
+def _mod_key_term(instances, non_native, desired, not_desired):
+    """What one mod adds to _scenario_side_key, given the mask of the side slots holding it."""
+    if instances & ~non_native or (instances & ITEM1_SLOTS and instances & ITEM2_SLOTS): availability = ALWAYS
+    elif instances & ITEM1_SLOTS: availability = ITEM1_ONLY
+    else: availability = ITEM2_ONLY
+    return 1 << (5 + 3 * (availability * 4 + bool(instances & desired) * 2 + bool(instances & not_desired)))
+
+def side_probability(mods_item1, mods_item2, desired_mods, not_desired_mods, base, side_cache=None, rules=None):
+    """calculate_modifier_probability for one side, memoized in `side_cache` if given.
+
+    `side_cache` is any mapping keyed by canonical_side_key.
+    """
+    key = None if side_cache is None else canonical_side_key(mods_item1, mods_item2, desired_mods,
+                                                             not_desired_mods, base, rules)
+    if key is None:
+        return calculate_modifier_probability(mods_item1, mods_item2, desired_mods, not_desired_mods,
+                                              base == BASE_ITEM1, base == BASE_ITEM2, rules)
+    prob = side_cache.get(key)
+    if prob is None:
+        prob = side_cache[key] = probability_from_key(key)
+    return prob
+
+# -------------------------
+# Packed scenarios
+# -------------------------
+# Slot layout of a Scenario (same as batch.py):
+#   0-2 item 1 prefixes, 3-5 item 1 suffixes, 6-8 item 2 prefixes, 9-11 item 2 suffixes
+SLOTS = 12
+ALL_SLOTS = 0xFFF
+ITEM1_SLOTS = 0x03F
+ITEM2_SLOTS = 0xFC0
+PREFIX_SLOTS = 0x1C7
+SUFFIX_SLOTS = 0xE38
+
+# Flag word: one 12-bit slot mask per flag.
+EXCLUSIVE = 0
+NON_NATIVE = 12
+DESIRED = 24
+NOT_DESIRED = 36
+
+# _SLOTS_OF[mask] lists the slot indices set in a 12-bit mask.
+def _slot_table():
+    # Built from the mask without its lowest bit: one small tuple per mask, cheap at import.
+    table = [()]
+    for mask in range(1, 1 << SLOTS):
+        table.append(((mask & -mask).bit_length() - 1,) + table[mask & (mask - 1)])
+    return tuple(table)
+
+_SLOTS_OF = _slot_table()
+
+# Slots of the item that does not give its base, by base choice.
+_LOSING_SLOTS = (0, ITEM2_SLOTS, ITEM1_SLOTS)
+
+# Mod ids only have to agree within one scenario (0 is the empty slot). from_request numbers
+# texts per call; callers that pack long-lived ids (the planner) intern them in the registry.
+intern_mod = default_registry.intern
+
+
+class Scenario:
+    """Fixed-size packed form of a request: 12 mod ids, one flag word and the base."""
+    __slots__ = ('mods', 'flags', 'base', 'present')
+
+    def __init__(self, mods, flags, base=BASE_ANY, present=None):
+        self.mods = mods
+        self.flags = flags
+        self.base = base
+        if present is None:
+            present = 0
+            for i in range(SLOTS):
+                if mods[i]: present |= 1 << i
+        self.present = present
+
+    @classmethod
+    def from_request(cls, request, ids=None):
+        """Pack a RecombinationRequest. Mod ids are numbered per call (first text seen is 1),
+        so client text never accumulates in a global table; pass `ids` (text -> id) to read them back."""
+        if ids is None: ids = {}
+        mods = [0] * SLOTS
+        flags = 0
+        for offset, affixes in ((0, request.item1), (6, request.item2)):
+            next_slot, limit = [offset, offset + 3], (offset + 3, offset + 6)
+            for affix in affixes:
+                side = 0 if affix.type == PREFIX else 1
+                slot = next_slot[side]
+                if slot >= limit[side]: raise ValueError('an item can have at most 3 prefixes and 3 suffixes')
+                next_slot[side] = slot + 1
+                if not affix.mod: continue
+                text = affix.mod.strip()
+                # Whitespace-only input keeps its flags (for the conflict check) but no mod.
+                mods[slot] = ids.setdefault(text, len(ids) + 1) if text else 0
+                bit = 1 << slot
+                if affix.exclusive: flags |= bit << EXCLUSIVE
+                if affix.non_native: flags |= bit << NON_NATIVE
+                if affix.desired: flags |= bit << DESIRED
+                if affix.not_desired: flags |= bit << NOT_DESIRED
+        return cls(tuple(mods), flags, request.base)
+
+
+def _scenario_side_key(mods, present, non_native, desired, not_desired, side_slots, base):
+    """canonical_side_key computed straight from the packed masks (a side has at most 6 slots)."""
+    side = present & side_slots
+    total_mod_count = side.bit_count()
+
+    classes = {}
+    for i in _SLOTS_OF[side & ITEM1_SLOTS]:
+        mod = mods[i]
+        if not non_native >> i & 1: classes[mod] = ALWAYS
+        elif classes.get(mod, ITEM1_ONLY) != ALWAYS: classes[mod] = ITEM1_ONLY
+    for i in _SLOTS_OF[side & ITEM2_SLOTS]:
+        mod = mods[i]
+        if not non_native >> i & 1 or classes.get(mod, ITEM2_ONLY) != ITEM2_ONLY: classes[mod] = ALWAYS
+        else: classes[mod] = ITEM2_ONLY
+
+    desired_mods = {mods[i] for i in _SLOTS_OF[desired & side]}
+    not_desired_mods = {mods[i] for i in _SLOTS_OF[not_desired & side]}
+    key = total_mod_count | (base << 3)
+    for mod, availability in classes.items():
+        key += 1 << (5 + 3 * (availability * 4 + (mod in desired_mods) * 2 + (mod in not_desired_mods)))
+    return key
+
+# BINOMIAL[n][k] == comb(n, k) for every pool size a side can have.
+BINOMIAL = tuple(tuple(comb(n, k) for k in range(n + 1)) for n in range(MAX_SIDE_MODS + 1))
+
+def _selection_ratio(n_desired, n_missing, n_selectable, n_non_desired, outcome_count):
+    """calculate_selection_probability on counts, as an integer (favorable, total) pair."""
+    if n_missing: return 0, 1
+    if n_desired > outcome_count: return 0, 1
+    total_unique_selectable = n_desired + n_non_desired
+    if total_unique_selectable < outcome_count:
+        if n_desired == total_unique_selectable: return 1, 1
+        elif outcome_count > 3: return 0, 1
+    if n_selectable < outcome_count: return 0, 1
+    remaining_slots = outcome_count - n_desired
+    if remaining_slots > n_non_desired: return 0, 1
+    return BINOMIAL[n_non_desired][remaining_slots], BINOMIAL[n_selectable][outcome_count]
+
+def _decode_key(key):
+    """(rules, total_mod_count, base, n_desired, {winning base: (n_missing, n_selectable, n_non_desired)})."""
+    rules = rules_by_id(key >> RULES_SHIFT)
+    total_mod_count = key & 7
+    base = (key >> 3) & 3
+    counts = [(key >> (5 + 3 * t)) & 7 for t in range(SIDE_KEY_TYPES)]
+    n_desired = sum(counts[t] for t in range(SIDE_KEY_TYPES) if t & 2)
+    per_base = {}
+    for winning_base, own_class in ((1, ITEM1_ONLY), (2, ITEM2_ONLY)):
+        n_missing = n_selectable = n_non_desired = 0
+        for t, count in enumerate(counts):
+            if not count: continue
+            available = t // 4 in (ALWAYS, own_class)
+            if t & 2 and not available: n_missing += count
+            if available and not t & 1:
+                n_selectable += count
+                if not t & 2: n_non_desired += count
+        per_base[winning_base] = (n_missing, n_selectable, n_non_desired)
+    return rules, total_mod_count, base, n_desired, per_base
+
+@lru_cache(maxsize=1 << 16)
+def probability_from_key(key):
+    """calculate_modifier_probability for the side described by a canonical_side_key.
+
+    Float operations run in the calculator's order, so the result is bit-identical to it.
+    """
+    rules, total_mod_count, base, n_desired, per_base = _decode_key(key)
+    if total_mod_count == 0: return 0.0 if n_desired > 0 else 1.0
+
+    base_weight = rules.base_weight
+    total_prob = 0.0
+    for outcome_count, count_prob in rules.count_probabilities[total_mod_count]:
+        if outcome_count == 0:
+            if n_desired == 0: total_prob += count_prob
+            continue
+        if n_desired > outcome_count: continue
+        favorable1, total1 = _selection_ratio(n_desired, *per_base[1], outcome_count)
+        favorable2, total2 = _selection_ratio(n_desired, *per_base[2], outcome_count)
+        prob_base1_affix, prob_base2_affix = favorable1 / total1, favorable2 / total2
+        if base == BASE_ANY: selection_prob = (prob_base1_affix * base_weight) + (prob_base2_affix * base_weight)
+        elif base == BASE_ITEM1: selection_prob = prob_base1_affix * base_weight
+        else: selection_prob = prob_base2_affix * base_weight
+        total_prob += count_prob * selection_prob
+    return total_prob
+
+@lru_cache(maxsize=1 << 16)
+def exact_probability_from_key(key):
+    """probability_from_key as an exact Fraction; float() of it is the correctly rounded value."""
+    rules, total_mod_count, base, n_desired, per_base = _decode_key(key)
+    if total_mod_count == 0: return Fraction(0 if n_desired > 0 else 1)
+
+    # Integer numerator/denominator accumulation, normalised once at the end.
+    weight, weight_denominator = rules.exact_base_weight.numerator, rules.exact_base_weight.denominator
+    numerator, denominator = 0, 1
+    for outcome_count, count_prob in rules.exact_count_probabilities[total_mod_count]:
+        if outcome_count == 0:
+            if n_desired == 0:
+                numerator = numerator * count_prob.denominator + count_prob.numerator * denominator
+                denominator *= count_prob.denominator
+            continue
+        if n_desired > outcome_count: continue
+        favorable1, total1 = _selection_ratio(n_desired, *per_base[1], outcome_count)
+        favorable2, total2 = _selection_ratio(n_desired, *per_base[2], outcome_count)
+        if base == BASE_ANY: term, term_denominator = favorable1 * total2 + favorable2 * total1, total1 * total2
+        elif base == BASE_ITEM1: term, term_denominator = favorable1, total1
+        else: term, term_denominator = favorable2, total2
+        term *= weight * count_prob.numerator
+        term_denominator *= weight_denominator * count_prob.denominator
+        numerator = numerator * term_denominator + term * denominator
+        denominator *= term_denominator
+    return Fraction(numerator, denominator)
+
+def _packed_side_probability(scenario, non_native, desired, not_desired, side_slots, side_cache, exact, rules,
+                             probe=None):
+    key = _scenario_side_key(scenario.mods, scenario.present, non_native, desired, not_desired,
+                             side_slots, scenario.base) | rules.key_bits
+    prob = _key_probability(key, side_cache, exact)
+    if probe is not None: probe.side_done(side_slots, key)
+    return prob
+
+def _key_probability(key, side_cache, exact):
+    from_key = exact_probability_from_key if exact else probability_from_key
+    if side_cache is None: return from_key(key)
+    prob = side_cache.get(key)
+    if prob is None:
+        prob = side_cache[key] = from_key(key)
+    return prob
+
+
+# -------------------------
+# Request evaluation
+# -------------------------
+def evaluate(request, side_cache=None, exact=False, rules=None):
+    """Return (probability, error_code) for a RecombinationRequest.
+
+    Exactly one of the two is None, mirroring the Streamlit calculator.
+    `side_cache` is an optional mapping keyed by canonical_side_key, shared
+    between calls so identical prefix-side or suffix-side sub-problems are
+    only computed once. With `exact=True` the probability is a Fraction;
+    exact and float results must not share a side cache. `rules` is a
+    `rules.Rules` (default: DEFAULT_RULES); its key_id is part of every side
+    key, so one cache can serve several rulesets.
+    """
+    return evaluate_scenario(Scenario.from_request(request), side_cache, exact, rules)
+
+# Instrumentation probe installed by metrics.enable(); None keeps the hot path uninstrumented.
+_probe = None
+
+def evaluate_scenario(scenario, side_cache=None, exact=False, rules=None):
+    if _probe is not None: return _probe.evaluate_scenario(scenario, side_cache, exact, rules)
+    return _evaluate_scenario(scenario, side_cache, exact, rules)
+
+def _evaluate_scenario(scenario, side_cache, exact, rules, probe=None):
+    """The evaluation pipeline. A metrics probe (see metrics.py) is told when each stage ends."""
+    if rules is None: rules = DEFAULT_RULES
+    result, masks = _check_scenario(scenario, exact, rules)
+    if probe is not None: probe.stage_done('validate')
+    if masks is None: return result
+
+    # --- NORMAL HESAPLAMA ---
+    non_native, desired, not_desired = masks
+    prefix_prob = _packed_side_probability(scenario, non_native, desired, not_desired, PREFIX_SLOTS, side_cache, exact, rules, probe)
+    suffix_prob = _packed_side_probability(scenario, non_native, desired, not_desired, SUFFIX_SLOTS, side_cache, exact, rules, probe)
+    return prefix_prob * suffix_prob, None
+
+def _scenario_masks(scenario, rules):
+    """(exclusive, non_native, desired_raw, desired, not_desired) slot masks of a scenario."""
+    flags, present = scenario.flags, scenario.present
+    exclusive = flags >> EXCLUSIVE & present
+    non_native = flags >> NON_NATIVE & present if rules.non_native_drops else 0
+    desired_raw = flags >> DESIRED & ALL_SLOTS
+    desired = desired_raw & present
+    # Desired wins over Not Desired on the same slot (the UI's elif).
+    not_desired = flags >> NOT_DESIRED & present & ~desired
+    return exclusive, non_native, desired_raw, desired, not_desired
+
+def _check_scenario(scenario, exact, rules, memo=None):
+    """Validation and special cases: ((probability, error_code), None) when they decide the
+    result, else (None, (non_native, desired, not_desired)) masks for the side calculation.
+
+    `memo` is an optional dict for callers that check many variants of one scenario (same
+    mods, `exact` and rules): the desired-mod checks are then run once per desired mask,
+    base and the non-native bits they read, and the exclusive checks once per
+    (exclusive, desired, base).
+    """
+    exclusive, non_native, desired_raw, desired, not_desired = _scenario_masks(scenario, rules)
+
+    # --- TEMEL HATA KONTROLLERİ ---
+    if desired_raw & (scenario.flags >> NOT_DESIRED): return (None, ERROR_PREF_CONFLICT), None
+
+    if memo is None:
+        result, n_desired_mods = _check_desired(scenario.mods, desired, non_native, scenario.base, exact)
+    else:
+        # Only non-native desired slots and non-native slots on the losing item are read.
+        read_non_native = non_native & (desired | _LOSING_SLOTS[scenario.base])
+        key = ('desired', desired, read_non_native, scenario.base)
+        checked = memo.get(key)
+        if checked is None:
+            checked = memo[key] = _check_desired(scenario.mods, desired, read_non_native, scenario.base, exact)
+        result, n_desired_mods = checked
+    if result is None:
+        if memo is None:
+            result = _check_exclusive(exclusive, desired, n_desired_mods, scenario.base, exact, rules)
+        else:
+            key = ('exclusive', exclusive, desired, scenario.base)
+            result = memo.get(key, key)
+            if result is key:
+                result = memo[key] = _check_exclusive(exclusive, desired, n_desired_mods, scenario.base, exact, rules)
+    if result is not None: return result, None
+    return None, (non_native, desired, not_desired)
+
+def _check_desired(mods, desired, non_native, base, exact):
+    """Desired-mod count and non-native checks: (result or None, number of distinct desired mods)."""
+    desired_prefixes = {mods[i] for i in _SLOTS_OF[desired & PREFIX_SLOTS]}
+    desired_suffixes = {mods[i] for i in _SLOTS_OF[desired & SUFFIX_SLOTS]}
+    n_desired_mods = len(desired_prefixes) + len(desired_suffixes)
+    if len(desired_prefixes) > 3 or len(desired_suffixes) > 3: return (None, ERROR_TOO_MANY_DESIRED), n_desired_mods
+    if not desired: return (None, ERROR_NO_DESIRED), n_desired_mods
+
+    # --- NON-NATIVE BASE ÇAKIŞMA KONTROLÜ ---
+    non_native_desired = non_native & desired
+    item1_has_non_native_desired = bool(non_native_desired & ITEM1_SLOTS)
+    item2_has_non_native_desired = bool(non_native_desired & ITEM2_SLOTS)
+
+    if base == BASE_ANY:
+        if item1_has_non_native_desired and item2_has_non_native_desired:
+            return (None, ERROR_BOTH_NON_NATIVE), n_desired_mods
+        if item1_has_non_native_desired or item2_has_non_native_desired:
+            return (None, ERROR_NON_NATIVE_MANUAL), n_desired_mods
+    elif item1_has_non_native_desired and item2_has_non_native_desired:
+        return (None, ERROR_BOTH_NON_NATIVE), n_desired_mods
+
+    # Non-Native Çakışması Kontrolü (%0 döndürür)
+    losing_slots = _LOSING_SLOTS[base]
+    if non_native & losing_slots:
+        desired_mods_all = desired_prefixes | desired_suffixes
+        for i in _SLOTS_OF[non_native & losing_slots]:
+            if mods[i] in desired_mods_all: return ((Fraction(0) if exact else 0.0), None), n_desired_mods
+    return None, n_desired_mods
+
+def _check_exclusive(exclusive, desired, n_desired_mods, base, exact, rules):
+    """The 1P/1S cross case and the exclusive mod limits: a result, or None."""
+    # --- HARDCODED 1P/1S ÇAPRAZ İSTİSNASI ---
+    plain_desired = desired & ~exclusive
+    is_cross_case_1 = (plain_desired & ITEM1_SLOTS & PREFIX_SLOTS and exclusive & ITEM1_SLOTS & SUFFIX_SLOTS and
+                       exclusive & ITEM2_SLOTS & PREFIX_SLOTS and plain_desired & ITEM2_SLOTS & SUFFIX_SLOTS)
+    is_cross_case_2 = (exclusive & ITEM1_SLOTS & PREFIX_SLOTS and plain_desired & ITEM1_SLOTS & SUFFIX_SLOTS and
+                       plain_desired & ITEM2_SLOTS & PREFIX_SLOTS and exclusive & ITEM2_SLOTS & SUFFIX_SLOTS)
+
+    num_exclusive_total = exclusive.bit_count()
+    if is_cross_case_1 or is_cross_case_2:
+        if num_exclusive_total == 2 and n_desired_mods == 2:
+            prob = rules.exact_cross_probability if exact else rules.cross_probability
+            if base != BASE_ANY:
+                return prob * (rules.exact_base_weight if exact else rules.base_weight), None
+            return prob, None
+
+    # --- NORMAL EXCLUSIVE MOD SAYISI KONTROLÜ ---
+    if num_exclusive_total > rules.max_exclusive:
+        return None, ERROR_EXCLUSIVE
+    if (exclusive & desired).bit_count() > rules.max_desired_exclusive:
+        return None, ERROR_EXCLUSIVE
+    return None
@@ -0,0 +1,56 @@
+"""Incrementally updated scenario for the live Streamlit calculator.
+
+`LiveScenario` keeps the 2 x 6 affix slots and the base choice as a structured
+object. Widget callbacks change one slot at a time and drop the memoized
+result; on the next read the untouched side (prefix or suffix) is served from
+the scenario's own small side cache, so only the affected side is recomputed.
+"""
+from dataclasses import replace
+
+from cache import LRUCache
+from engine import BASE_ANY, PREFIX, SUFFIX, Affix, RecombinationRequest, evaluate
+
+SLOTS = 6
+FIELDS = ('mod', 'exclusive', 'non_native', 'desired', 'not_desired')
+
+
+def slot_type(slot):
+    return PREFIX if slot < 3 else SUFFIX
+
+
+class LiveScenario:
+    def __init__(self):
+        self.items = {item: [Affix('', slot_type(slot)) for slot in range(SLOTS)] for item in (1, 2)}
+        self.base = BASE_ANY
+        # Two entries per side are enough to keep the untouched side warm.
+        self.side_cache = LRUCache(maxsize=4)
+        self._result = None
+
+    def set(self, item, slot, field, value):
+        if field not in FIELDS: raise ValueError(f'unknown affix field {field!r}')
+        current = self.items[item][slot]
+        if getattr(current, field) == value: return
+        self.items[item][slot] = replace(current, **{field: value})
+        self._result = None
+
+    def set_base(self, base):
+        if base != self.base:
+            self.base = base
+            self._result = None
+
+    def request(self):
+        return RecombinationRequest(tuple(self.items[1]), tuple(self.items[2]), self.base)
+
+    def result(self):
+        """(probability, error_code) for the current state, recomputing only what changed."""
+        if self._result is None:
+            self._result = evaluate(self.request(), self.side_cache)
+        return self._result
+
+    def load(self, request):
+        """Replace the whole state, e.g. after pasting an item or restoring a session."""
+        for item, affixes in ((1, request.item1), (2, request.item2)):
+            for slot in range(SLOTS):
+                self.items[item][slot] = affixes[slot] if slot < len(affixes) else Affix('', slot_type(slot))
+        self.base = request.base
+        self._result = None
@@ -0,0 +1,130 @@
+"""NumPy kernels for the selection/modifier probabilities.
+
+Vectorized counterparts of `engine.calculate_selection_probability` and
+`engine.calculate_modifier_probability`. A batch is described by boolean
+masks of shape (n, K): column k is the k-th distinct mod of that row's side.
+
+    native_item1 / native_item2          item carries a native instance of the mod
+    non_native_item1 / non_native_item2  item carries a non-native instance
+    desired / not_desired                mod is in the desired / not-desired set
+
+Results are bit-identical to the scalar functions, including their early
+returns. `rules` (default: DEFAULT_RULES) supplies the count table, the base
+weight and the non-native policy. Requires NumPy; the rest of the engine
+does not.
+"""
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+from rules import DEFAULT_RULES
+
+MAX_MODS = 12
+MAX_OUTCOME = 3
+
+# BINOMIAL[n, k] == comb(n, k) as float64 (exact for these sizes)
+BINOMIAL = np.array([[comb(n, k) for k in range(MAX_MODS + 1)] for n in range(MAX_MODS + 1)], dtype=np.float64)
+
+@lru_cache(maxsize=None)
+def count_table(rules=DEFAULT_RULES):
+    """table[total_mod_count, outcome_count] == get_count_probabilities(total, rules)[outcome], 0 when absent."""
+    table = np.zeros((MAX_MODS + 1, MAX_OUTCOME + 1), dtype=np.float64)
+    for total, distribution in enumerate(rules.count_probabilities[:MAX_MODS + 1]):
+        for outcome, prob in distribution:
+            table[total, outcome] = prob
+    table.flags.writeable = False
+    return table
+
+COUNT_TABLE = count_table()
+
+
+def available_mask(native_item1, native_item2, non_native_item1, non_native_item2, winning_base):
+    winning_base = np.asarray(winning_base)
+    if winning_base.ndim == 1: winning_base = winning_base[:, None]
+    return (native_item1 | native_item2 |
+            (non_native_item1 & (winning_base == 1)) |
+            (non_native_item2 & (winning_base == 2)))
+
+def selection_probability_batch(available, desired, not_desired, outcome_count):
+    """Vectorized calculate_selection_probability over (n, K) masks."""
+    outcome_count = np.broadcast_to(np.asarray(outcome_count, dtype=np.int64), available.shape[:1])
+
+    n_desired = desired.sum(axis=1)
+    selectable = available & ~not_desired
+    n_selectable = selectable.sum(axis=1)
+    n_non_desired = (selectable & ~desired).sum(axis=1)
+    total_unique = n_desired + n_non_desired
+    remaining = outcome_count - n_desired
+
+    fav = BINOMIAL[n_non_desired, np.clip(remaining, 0, MAX_MODS)]
+    tot = BINOMIAL[n_selectable, np.clip(outcome_count, 0, MAX_MODS)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prob = np.where(tot == 0, 0.0, fav / tot)
+
+    # Early returns of the scalar path, applied from last to first so the first match wins.
+    prob = np.where(remaining > n_non_desired, 0.0, prob)
+    prob = np.where(n_selectable < outcome_count, 0.0, prob)
+    short = total_unique < outcome_count
+    prob = np.where(short & (n_desired != total_unique) & (outcome_count > 3), 0.0, prob)
+    prob = np.where(short & (n_desired == total_unique), 1.0, prob)
+    prob = np.where(n_desired > outcome_count, 0.0, prob)
+    prob = np.where((desired & ~available).any(axis=1), 0.0, prob)
+    return prob
+
+def modifier_probability_batch(native_item1, native_item2, non_native_item1, non_native_item2,
+                               desired, not_desired, total_mod_count, base, rules=None):
+    """Vectorized calculate_modifier_probability; `total_mod_count` counts mod instances."""
+    if rules is None: rules = DEFAULT_RULES
+    total_mod_count = np.asarray(total_mod_count, dtype=np.int64)
+    base = np.broadcast_to(np.asarray(base, dtype=np.int64), total_mod_count.shape)
+    n_desired = desired.sum(axis=1)
+
+    if rules.non_native_drops:
+        available1 = available_mask(native_item1, native_item2, non_native_item1, non_native_item2, 1)
+        available2 = available_mask(native_item1, native_item2, non_native_item1, non_native_item2, 2)
+    else:
+        available1 = available2 = native_item1 | native_item2 | non_native_item1 | non_native_item2
+    weight = rules.base_weight
+
+    counts = count_table(rules)[np.clip(total_mod_count, 0, MAX_MODS)]
+    total = np.where(n_desired == 0, counts[:, 0], 0.0)
+    for outcome_count in range(1, MAX_OUTCOME + 1):
+        prob1 = selection_probability_batch(available1, desired, not_desired, outcome_count)
+        prob2 = selection_probability_batch(available2, desired, not_desired, outcome_count)
+        selection = np.where(base == 1, prob1 * weight,
+                             np.where(base == 2, prob2 * weight, (prob1 * weight) + (prob2 * weight)))
+        selection = np.where(n_desired > outcome_count, 0.0, selection)
+        total = total + counts[:, outcome_count] * selection
+
+    empty = total_mod_count == 0
+    return np.where(empty, np.where(n_desired > 0, 0.0, 1.0), total)
+
+def side_masks(sides, width=MAX_MODS):
+    """Build kernel masks from engine-style sides.
+
+    `sides` is a sequence of (mods_item1, mods_item2, desired_mods, not_desired_mods)
+    tuples as passed to calculate_modifier_probability. Returns a dict of masks
+    plus the `total_mod_count` column.
+    """
+    n = len(sides)
+    masks = {name: np.zeros((n, width), dtype=bool) for name in
+             ('native_item1', 'native_item2', 'non_native_item1', 'non_native_item2', 'desired', 'not_desired')}
+    total_mod_count = np.zeros(n, dtype=np.int64)
+    for row, (mods_item1, mods_item2, desired_mods, not_desired_mods) in enumerate(sides):
+        columns = {}
+        for mod_info in list(mods_item1) + list(mods_item2):
+            col = columns.setdefault(mod_info['mod'], len(columns))
+            kind = 'non_native' if mod_info['non_native'] else 'native'
+            masks[f"{kind}_item{mod_info['item']}"][row, col] = True
+        for mod, col in columns.items():
+            masks['desired'][row, col] = mod in desired_mods
+            masks['not_desired'][row, col] = mod in not_desired_mods
+        # Desired mods absent from the side still make the probability 0.
+        for mod in desired_mods:
+            if mod not in columns:
+                masks['desired'][row, len(columns)] = True
+                columns[mod] = len(columns)
+        total_mod_count[row] = len(mods_item1) + len(mods_item2)
+    masks['total_mod_count'] = total_mod_count
+    return masks
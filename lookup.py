@@ -0,0 +1,137 @@
+"""Precomputed side-probability table over the whole canonical scenario space.
+
+Every side sub-problem (at most 6 mod instances across the two items) maps to
+an `engine.canonical_side_key`. `generate_table` enumerates all feasible keys
+and computes their probability once; `write_table` stores them as a compact
+binary file (sorted uint64 keys, float64 values, then the exact value of each
+entry as uint32 numerator and denominator arrays) and `LookupTable` loads it
+for O(1) lookups. A loaded table can be passed anywhere the engine accepts a
+`side_cache`; one loaded with `exact=True` serves `evaluate(..., exact=True)`.
+
+    python lookup.py side_table.bin [ruleset version]
+"""
+import struct
+import sys
+from array import array
+from fractions import Fraction
+from itertools import product
+
+from engine import (ALWAYS, ITEM1_ONLY, ITEM2_ONLY, MAX_SIDE_MODS, SIDE_KEY_TYPES,
+                    calculate_modifier_probability, canonical_side_key, exact_probability_from_key)
+from rules import get_rules
+
+MAGIC = b'RCLT'
+FORMAT_VERSION = 2                # 1: keys and floats only
+HEADER = struct.Struct('<4sII')   # magic, format version, entry count
+ITEM_CAPACITY = 3                 # affixes of one side an item can carry
+MAX_DESIRED = 3                   # more desired mods per side is rejected by evaluate()
+
+
+def _type_vectors(remaining, start=0):
+    """Yield every way to distribute up to `remaining` distinct mods over the key types."""
+    yield ()
+    if remaining == 0: return
+    for t in range(start, SIDE_KEY_TYPES):
+        for rest in _type_vectors(remaining - 1, t):
+            yield (t,) + rest
+
+def _build_side(types, total_mod_count):
+    """Return a concrete (mods_item1, mods_item2, desired, not_desired) for a type multiset, or None."""
+    mods = [(f'm{i}', t // 4, bool(t & 2), bool(t & 1)) for i, t in enumerate(types)]
+    item1_only = [m for m in mods if m[1] == ITEM1_ONLY]
+    item2_only = [m for m in mods if m[1] == ITEM2_ONLY]
+    always = [m for m in mods if m[1] == ALWAYS]
+
+    for count1, on_item1 in product(range(ITEM_CAPACITY + 1), range(len(always) + 1)):
+        count2 = total_mod_count - count1
+        extra1 = count1 - len(item1_only) - on_item1
+        extra2 = count2 - len(item2_only) - (len(always) - on_item1)
+        if not 0 <= count2 <= ITEM_CAPACITY or extra1 < 0 or extra2 < 0: continue
+        if (extra1 and not (item1_only or always)) or (extra2 and not (item2_only or always)): continue
+
+        mods_item1 = [{'mod': m[0], 'non_native': True, 'item': 1} for m in item1_only]
+        mods_item1 += [{'mod': m[0], 'non_native': False, 'item': 1} for m in always[:on_item1]]
+        mods_item2 = [{'mod': m[0], 'non_native': True, 'item': 2} for m in item2_only]
+        mods_item2 += [{'mod': m[0], 'non_native': False, 'item': 2} for m in always[on_item1:]]
+        # Duplicate instances repeat a mod already on the item, or a native copy of an
+        # ALWAYS mod; either way no mod changes class.
+        for item_num, mods_item, extra in ((1, mods_item1, extra1), (2, mods_item2, extra2)):
+            if not extra: continue
+            source = dict(mods_item[0]) if mods_item else {'mod': always[0][0], 'non_native': False, 'item': item_num}
+            mods_item += [dict(source) for _ in range(extra)]
+
+        desired = {m[0] for m in mods if m[2]}
+        not_desired = {m[0] for m in mods if m[3]}
+        return mods_item1, mods_item2, desired, not_desired
+    return None
+
+def generate_table(rules=None):
+    """Return {canonical_side_key: probability} for every feasible side under `rules` (default ruleset)."""
+    table = {}
+    for types in _type_vectors(MAX_SIDE_MODS):
+        if sum(1 for t in types if t & 2) > MAX_DESIRED: continue
+        for total_mod_count in range(len(types), MAX_SIDE_MODS + 1):
+            side = _build_side(types, total_mod_count)
+            if side is None: continue
+            for base in (0, 1, 2):
+                key = canonical_side_key(*side, base, rules)
+                table[key] = calculate_modifier_probability(*side, base == 1, base == 2, rules)
+    return table
+
+def write_table(path, table=None, rules=None):
+    if table is None: table = generate_table(rules)
+    keys = array('Q', sorted(table))
+    values = array('d', (table[k] for k in keys))
+    exact = [exact_probability_from_key(k) for k in keys]
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(keys)))
+        keys.tofile(f)
+        values.tofile(f)
+        array('I', (e.numerator for e in exact)).tofile(f)
+        array('I', (e.denominator for e in exact)).tofile(f)
+    return len(keys)
+
+
+class LookupTable:
+    """Read-only side cache backed by a table written with write_table."""
+
+    def __init__(self, keys, values):
+        self.values = values
+        self.index = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def load(cls, path, exact=False):
+        """Load a table; with `exact=True` the values are Fractions (needs a version 2 file)."""
+        with open(path, 'rb') as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version not in (1, FORMAT_VERSION) or (exact and version == 1):
+                raise ValueError(f'{path} is not a version {FORMAT_VERSION} lookup table')
+            keys, values = array('Q'), array('d')
+            keys.fromfile(f, count)
+            values.fromfile(f, count)
+            if exact:
+                numerators, denominators = array('I'), array('I')
+                numerators.fromfile(f, count)
+                denominators.fromfile(f, count)
+                values = [Fraction(n, d) for n, d in zip(numerators, denominators)]
+        return cls(keys, values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get(self, key, default=None):
+        i = self.index.get(key)
+        return default if i is None else self.values[i]
+
+    def __setitem__(self, key, value):
+        # The table is complete for every key the engine can produce; misses are not recorded.
+        pass
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'side_table.bin'
+    rules = get_rules(sys.argv[2]) if len(sys.argv) > 2 else None
+    print(f'wrote {write_table(path, rules=rules)} entries to {path}')
@@ -0,0 +1,201 @@
+"""Optional instrumentation of the calculation pipeline.
+
+Off by default. While disabled the engine pays one `is None` check per
+`evaluate_scenario` call; `enable()` installs a `Metrics` probe that runs
+every evaluation (UI, batch, service, planner, ...) through the engine's own
+pipeline (`engine._evaluate_scenario`) with its stage hooks on, and records
+
+* per-stage timers: `validate` (`_check_scenario`), `prefix_side` and
+  `suffix_side`, plus any caller stage wrapped in `stage(name)` (the UI
+  times its session-state collection as `collect`),
+* which branch decided the result: each error code, `cross_case` (the 1P/1S
+  exclusive exception), `non_native_zero` or `computed`,
+* side cache hits and misses, and the `probability_from_key` lru_cache stats,
+* time per canonical side key, so slow scenario shapes can be found,
+* optionally a cProfile sample of every `profile_every`-th evaluation.
+
+`snapshot()` returns everything as plain JSON data (the service serves it
+on GET /metrics); scenarios slower than `slow_ms` are written to the
+`recombinator.metrics` logger as one JSON object per line.
+
+    import metrics
+    probe = metrics.enable(slow_ms=5, profile_every=100)
+    ...
+    print(probe.snapshot())
+"""
+import json
+import logging
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+import engine
+from engine import PREFIX_SLOTS, DEFAULT_RULES, probability_from_key
+
+logger = logging.getLogger('recombinator.metrics')
+
+STAGES = ('validate', 'prefix_side', 'suffix_side')
+COMPUTED = 'computed'
+CROSS_CASE = 'cross_case'
+NON_NATIVE_ZERO = 'non_native_zero'
+TOP_SHAPES = 10
+
+
+def _new_profiler():
+    import cProfile     # only when sampling is on
+    return cProfile.Profile()
+
+
+class Metrics:
+    def __init__(self, slow_ms=None, profile_every=0):
+        self.slow = slow_ms / 1000 if slow_ms else None
+        self.profile_every = profile_every
+        self.profiler = _new_profiler() if profile_every else None
+        self.reset()
+
+    def reset(self):
+        self.evaluations = 0
+        self.stage_seconds = Counter()
+        self.stage_calls = Counter()
+        self.outcomes = Counter()
+        self.side_hits = self.side_misses = 0
+        self.shapes = {}          # side key -> [calls, seconds]
+        self.slow_count = 0
+        if self.profiler is not None: self.profiler = _new_profiler()
+
+    def add(self, name, seconds):
+        self.stage_seconds[name] += seconds
+        self.stage_calls[name] += 1
+
+    @contextmanager
+    def stage(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    # -------------------------
+    # Instrumented evaluation (engine._evaluate_scenario with its hooks on)
+    # -------------------------
+    def evaluate_scenario(self, scenario, side_cache, exact, rules):
+        self.evaluations += 1
+        if self.profiler is None or self.evaluations % self.profile_every: return self._evaluate(scenario, side_cache, exact, rules)
+        self.profiler.enable()
+        try:
+            return self._evaluate(scenario, side_cache, exact, rules)
+        finally:
+            self.profiler.disable()
+
+    def _evaluate(self, scenario, side_cache, exact, rules):
+        run = _Run(self, side_cache)
+        result = engine._evaluate_scenario(scenario, None if side_cache is None else run, exact, rules, run)
+        if run.keys:
+            outcome = COMPUTED
+        else:
+            prob, error_code = result
+            outcome = error_code or (CROSS_CASE if prob else NON_NATIVE_ZERO)
+        self._done(run.start, outcome, scenario, rules or DEFAULT_RULES, *run.keys)
+        return result
+
+    def _done(self, start, outcome, scenario, rules, prefix_key=None, suffix_key=None):
+        seconds = perf_counter() - start
+        self.outcomes[outcome] += 1
+        if self.slow is not None and seconds > self.slow:
+            self.slow_count += 1
+            logger.warning(json.dumps({'event': 'slow_scenario', 'ms': seconds * 1000, 'outcome': outcome,
+                                       'base': scenario.base, 'rules': rules.version,
+                                       'prefix_key': prefix_key, 'suffix_key': suffix_key}))
+
+    # -------------------------
+    # Export
+    # -------------------------
+    def snapshot(self):
+        side_lookups = self.side_hits + self.side_misses
+        key_cache = probability_from_key.cache_info()
+        slowest = sorted(self.shapes.items(), key=lambda item: item[1][1] / item[1][0], reverse=True)[:TOP_SHAPES]
+        return {
+            'evaluations': self.evaluations,
+            'stages': {name: {'calls': self.stage_calls[name], 'seconds': self.stage_seconds[name]}
+                       for name in self.stage_calls},
+            'outcomes': dict(self.outcomes),
+            'side_cache': {'hits': self.side_hits, 'misses': self.side_misses,
+                           'hit_rate': self.side_hits / side_lookups if side_lookups else 0.0},
+            'key_cache': {'hits': key_cache.hits, 'misses': key_cache.misses, 'size': key_cache.currsize},
+            'slowest_shapes': [{'side_key': key, 'calls': calls, 'mean_us': seconds / calls * 1e6}
+                               for key, (calls, seconds) in slowest],
+            'slow_scenarios': self.slow_count,
+            'profile': self.profile_top() if self.profiler is not None else None,
+        }
+
+    def profile_top(self, limit=20):
+        """Sampled functions by own time: [{function, calls, tottime, cumtime}, ...]."""
+        import pstats
+        try:
+            stats = pstats.Stats(self.profiler).stats
+        except TypeError:       # no sample taken yet
+            return []
+        rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [{'function': f'{file}:{line}({func})', 'calls': nc, 'tottime': tt, 'cumtime': ct}
+                for (file, line, func), (_, nc, tt, ct, _) in rows]
+
+    def log(self):
+        """Write the snapshot to the metrics logger as one JSON line."""
+        logger.info(json.dumps({'event': 'metrics', **self.snapshot()}))
+
+
+class _Run:
+    """Hooks of one evaluation: stage timers and side keys. It also stands in for the
+    side cache (`get`/`__setitem__`) to count hits and misses."""
+    __slots__ = ('metrics', 'side_cache', 'start', 'last', 'keys')
+
+    def __init__(self, metrics, side_cache):
+        self.metrics = metrics
+        self.side_cache = side_cache
+        self.start = self.last = perf_counter()
+        self.keys = []
+
+    def stage_done(self, name):
+        now = perf_counter()
+        self.metrics.add(name, now - self.last)
+        self.last = now
+
+    def side_done(self, side_slots, key):
+        now = perf_counter()
+        seconds = now - self.last
+        self.last = now
+        metrics = self.metrics
+        if self.side_cache is None: metrics.side_misses += 1      # nothing to hit without a cache
+        metrics.add('prefix_side' if side_slots == PREFIX_SLOTS else 'suffix_side', seconds)
+        shape = metrics.shapes.get(key)
+        if shape is None: shape = metrics.shapes[key] = [0, 0.0]
+        shape[0] += 1
+        shape[1] += seconds
+        self.keys.append(key)
+
+    def get(self, key):
+        prob = self.side_cache.get(key)
+        if prob is None: self.metrics.side_misses += 1
+        else: self.metrics.side_hits += 1
+        return prob
+
+    def __setitem__(self, key, prob):
+        self.side_cache[key] = prob
+
+
+def enable(slow_ms=None, profile_every=0):
+    """Install a fresh Metrics probe in the engine and return it."""
+    probe = engine._probe = Metrics(slow_ms, profile_every)
+    return probe
+
+def disable():
+    engine._probe = None
+
+def active():
+    """The installed Metrics probe, or None."""
+    return engine._probe
+
+def stage(name):
+    """Time a caller-side stage when metrics are enabled; a no-op context otherwise."""
+    probe = engine._probe
+    return nullcontext() if probe is None else probe.stage(name)
@@ -0,0 +1,182 @@
+"""Monte Carlo simulation of a recombination, as a cross-check for the engine.
+
+A trial follows the same model as the analytic path, end to end:
+
+1. pick the winning base: item 1 with probability `rules.base_weight`
+   (the engine weights both bases by it, so rulesets with a weight other
+   than 0.5 are not comparable),
+2. drop non-native mods of the losing item (if the ruleset drops them) and
+   Not Desired mods,
+3. draw the outcome count per side from `get_count_probabilities(n, rules)`,
+4. draw that many distinct mods uniformly from what is left,
+
+and succeeds when every desired mod appears and the desired base (if any)
+won. Unlike `engine.evaluate`, both sides share one base draw, a draw larger
+than the pool keeps the whole pool, and there are no hardcoded special
+cases, so the two disagree where the analytic rules are approximations (the
+0.55 exclusive cross case, the base factor applied per side, a short pool
+scored as a failure). `EXPECTED_DIVERGENCE` names the regression scenarios
+that hit one of these on purpose; any other disagreement, or one of those
+starting to agree, is a regression and the cross-check exits with status 1.
+Requires NumPy.
+
+    python montecarlo.py            # cross-check the built-in regression set
+"""
+import math
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from engine import (BASE_ANY, BASE_ITEM1, BASE_ITEM2, PREFIX, SUFFIX, Affix, RecombinationRequest,
+                    evaluate, get_count_probabilities, request_sides)
+from rules import DEFAULT_RULES
+
+SimulationResult = namedtuple('SimulationResult', 'probability low high trials error_code')
+CheckResult = namedtuple('CheckResult', 'name analytic simulated low high agrees')
+
+Z_95 = 1.959963984540054
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    if trials == 0: return 0.0, 1.0
+    p = successes / trials
+    denom = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class _Side:
+    """Per-mod columns of one side, prepared once per simulation."""
+
+    def __init__(self, mods_item1, mods_item2, desired_mods, not_desired_mods, rules):
+        columns = {}
+        for mod_info in mods_item1 + mods_item2:
+            columns.setdefault(mod_info['mod'], len(columns))
+        for mod in desired_mods:
+            columns.setdefault(mod, len(columns))
+        k = len(columns)
+        self.available = {1: np.zeros(k, dtype=bool), 2: np.zeros(k, dtype=bool)}
+        for mod_info in mods_item1 + mods_item2:
+            col = columns[mod_info['mod']]
+            for base in (1, 2):
+                if not mod_info['non_native'] or mod_info['item'] == base or not rules.non_native_drops:
+                    self.available[base][col] = True
+        self.desired = np.array([mod in desired_mods for mod in columns], dtype=bool)
+        for base in (1, 2):
+            self.available[base] &= ~np.array([mod in not_desired_mods for mod in columns], dtype=bool)
+
+        count_probs = get_count_probabilities(len(mods_item1) + len(mods_item2), rules)
+        self.counts = np.array(list(count_probs) or [0])
+        self.count_weights = np.array(list(count_probs.values()) or [1.0])
+        self.count_weights = self.count_weights / self.count_weights.sum()
+
+    def success(self, rng, base):
+        n, k = len(base), len(self.desired)
+        if not self.desired.any(): return np.ones(n, dtype=bool)
+        outcome = rng.choice(self.counts, size=n, p=self.count_weights)
+        pool = np.where((base == 1)[:, None], self.available[1], self.available[2])
+        keys = np.where(pool, rng.random((n, k)), np.inf)
+        threshold = np.sort(keys, axis=1)[np.arange(n), np.clip(outcome - 1, 0, k - 1)]
+        chosen = pool & (keys <= threshold[:, None]) & (outcome > 0)[:, None]
+        return (chosen | ~self.desired).all(axis=1)
+
+
+def simulate(request, trials=1_000_000, seed=None, batch_size=1 << 18, rules=None):
+    """Estimate the success probability of `request`; validation errors are returned as in evaluate()."""
+    if rules is None: rules = DEFAULT_RULES
+    prob, error_code = evaluate(request, rules=rules)
+    if error_code: return SimulationResult(None, None, None, 0, error_code)
+
+    s = request_sides(request)
+    prefix = _Side(s['prefixes_item1'], s['prefixes_item2'], s['desired_prefixes'], s['not_desired_prefixes'], rules)
+    suffix = _Side(s['suffixes_item1'], s['suffixes_item2'], s['desired_suffixes'], s['not_desired_suffixes'], rules)
+
+    rng = np.random.default_rng(seed)
+    successes, done = 0, 0
+    while done < trials:
+        n = min(batch_size, trials - done)
+        base = np.where(rng.random(n) < rules.base_weight, 1, 2)
+        ok = prefix.success(rng, base) & suffix.success(rng, base)
+        if request.base != BASE_ANY: ok &= base == request.base
+        successes += int(ok.sum())
+        done += n
+    low, high = wilson_interval(successes, trials)
+    return SimulationResult(successes / trials, low, high, trials, None)
+
+def cross_check(scenarios, trials=1_000_000, seed=0, tolerance=0.0, rules=None):
+    """Compare evaluate() with simulate() for each (name, request) pair.
+
+    A scenario agrees when the analytic value lies inside the 95% interval
+    widened by `tolerance`.
+    """
+    results = []
+    for name, request in scenarios:
+        analytic, error_code = evaluate(request, rules=rules)
+        if error_code:
+            results.append(CheckResult(name, error_code, None, None, None, True))
+            continue
+        sim = simulate(request, trials, seed, rules=rules)
+        agrees = sim.low - tolerance <= analytic <= sim.high + tolerance
+        results.append(CheckResult(name, analytic, sim.probability, sim.low, sim.high, agrees))
+    return results
+
+
+def _affix(mod, mod_type=PREFIX, **flags):
+    return Affix(mod, mod_type, **flags)
+
+REGRESSION_SET = [
+    ('1 desired prefix vs filler', RecombinationRequest(
+        (_affix('Life', desired=True),), (_affix('Mana'),))),
+    ('1P + 1S desired, sparse', RecombinationRequest(
+        (_affix('Life', desired=True),), (_affix('Speed', SUFFIX, desired=True),))),
+    ('full 3P/3S, 2 desired per side', RecombinationRequest(
+        (_affix('Life', desired=True), _affix('Mana'), _affix('Armour'),
+         _affix('Fire', SUFFIX, desired=True), _affix('Cold', SUFFIX), _affix('Str', SUFFIX)),
+        (_affix('Evasion', desired=True), _affix('Phys'), _affix('Crit'),
+         _affix('Speed', SUFFIX, desired=True), _affix('Dex', SUFFIX), _affix('Int', SUFFIX)))),
+    ('shared desired mod on both items', RecombinationRequest(
+        (_affix('Life', desired=True), _affix('Mana')), (_affix('Life', desired=True), _affix('Armour')))),
+    ('not desired filler', RecombinationRequest(
+        (_affix('Life', desired=True), _affix('Mana', not_desired=True)), (_affix('Armour'),))),
+    ('non-native desired with its base', RecombinationRequest(
+        (_affix('Life', desired=True, non_native=True),), (_affix('Mana'), _affix('Armour')), BASE_ITEM1)),
+    ('desired base, plain mods', RecombinationRequest(
+        (_affix('Life', desired=True),), (_affix('Speed', SUFFIX, desired=True),), BASE_ITEM2)),
+    ('exclusive 1P/1S cross case', RecombinationRequest(
+        (_affix('Life', desired=True), _affix('ExS', SUFFIX, exclusive=True)),
+        (_affix('ExP', exclusive=True), _affix('Speed', SUFFIX, desired=True)))),
+]
+
+# Scenarios where the engine's rules knowingly differ from the simulated draw.
+EXPECTED_DIVERGENCE = {
+    'not desired filler': 'a 3-mod draw from a 2-mod pool scores 0 in the engine',
+    'desired base, plain mods': 'the engine applies the base factor to each side',
+    'exclusive 1P/1S cross case': 'the engine returns the hardcoded 0.55',
+}
+
+def unexpected(results, expected_divergence=EXPECTED_DIVERGENCE):
+    """Results whose agreement differs from what the regression set expects."""
+    return [r for r in results if r.agrees == (r.name in expected_divergence)]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    trials = int(argv[0]) if argv else 1_000_000
+    results = cross_check(REGRESSION_SET, trials)
+    for r in results:
+        if r.simulated is None:
+            print(f'{r.name:40s} {r.analytic}')
+            continue
+        if r.name in EXPECTED_DIVERGENCE:
+            mark = 'AGREES (expected to diverge)' if r.agrees else f'expected: {EXPECTED_DIVERGENCE[r.name]}'
+        else:
+            mark = 'ok' if r.agrees else 'MISMATCH'
+        print(f'{r.name:40s} analytic {r.analytic:.4f}  simulated {r.simulated:.4f} '
+              f'[{r.low:.4f}, {r.high:.4f}]  {mark}')
+    return 1 if unexpected(results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Stash-wide search for the best recombination partner of every item.
+
+Every unordered pair of items is evaluated with all target mods marked as
+Desired and no desired base (so (a, b) and (b, a) score the same). Mods are
+registered once while parsing; each item is then just 6 mod ids plus a
+desired mask and a mask of the target mods it holds. Pairs that do not hold
+every target mod between them cannot produce the target and are skipped;
+the rest are packed straight into an `engine.Scenario`. The pair
+space is cut into chunks of roughly equal pair counts and sharded over a
+`concurrent.futures` process pool. Items are sent to each worker once through
+the pool initializer, each worker keeps only a top-K heap per item and its
+own side cache, and the main process merges the heaps.
+
+    python pair_search.py dump.txt --target "+# to maximum Life" --target "#% increased Attack Speed"
+    python pair_search.py dump.txt --registry mods.json ...   # keep mod ids stable across runs
+"""
+import argparse
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import LRUCache
+from engine import DESIRED, Scenario, evaluate_scenario
+from registry import ModRegistry, default_registry
+from stash_parser import iter_items_from_path
+
+_worker_items = None
+_worker_cache = None
+_worker_goal = 0
+
+
+def pack_item(parsed_item, target_ids, registry=default_registry):
+    """(6 mod ids, desired mask, held mask) for one ParsedItem.
+
+    Slots are laid out like one half of a Scenario; bit k of the held mask is
+    set when the item carries the k-th target id in sorted order.
+    """
+    target_bit = {mod_id: 1 << k for k, mod_id in enumerate(sorted(target_ids))}
+    mods, desired, held = [0] * 6, 0, 0
+    for offset, parsed_mods in ((0, parsed_item.prefixes[:3]), (3, parsed_item.suffixes[:3])):
+        for slot, parsed_mod in enumerate(parsed_mods, offset):
+            mod_id = parsed_mod.mod_id if parsed_mod.mod_id is not None else registry.register(parsed_mod.text)
+            mods[slot] = mod_id
+            bit = target_bit.get(mod_id)
+            if bit is not None:
+                desired |= 1 << slot
+                held |= bit
+    return tuple(mods), desired, held
+
+def chunk_rows(n, pairs_per_chunk):
+    """Split rows 0..n-1 into (start, stop) ranges holding about `pairs_per_chunk` pairs each."""
+    chunks, start, pairs = [], 0, 0
+    for row in range(n):
+        pairs += n - row - 1
+        if pairs >= pairs_per_chunk:
+            chunks.append((start, row + 1))
+            start, pairs = row + 1, 0
+    if start < n: chunks.append((start, n))
+    return chunks
+
+def _init_worker(items, cache_size, goal):
+    global _worker_items, _worker_cache, _worker_goal
+    _worker_items = items
+    _worker_cache = LRUCache(cache_size)
+    _worker_goal = goal
+
+def _push(heaps, item, score, partner, top_k):
+    # Whole-tuple comparison breaks ties by partner index, so every sharding gives the same top K.
+    heap, entry = heaps.setdefault(item, []), (score, partner)
+    if len(heap) < top_k: heapq.heappush(heap, entry)
+    elif entry > heap[0]: heapq.heapreplace(heap, entry)
+
+def _search_rows(rows, top_k):
+    start, stop = rows
+    items, goal, heaps = _worker_items, _worker_goal, {}
+    for i in range(start, stop):
+        mods_i, desired_i, held_i = items[i]
+        for j in range(i + 1, len(items)):
+            mods_j, desired_j, held_j = items[j]
+            # A pair that lacks part of the target can never produce it.
+            if held_i | held_j != goal: continue
+            scenario = Scenario(mods_i + mods_j, (desired_i | desired_j << 6) << DESIRED)
+            prob, error_code = evaluate_scenario(scenario, _worker_cache)
+            if error_code or not prob: continue
+            _push(heaps, i, prob, j, top_k)
+            _push(heaps, j, prob, i, top_k)
+    return heaps
+
+def search_pairs(items, target_ids, top_k=3, workers=None, pairs_per_chunk=20000, cache_size=65536):
+    """Return {item index: [(probability, partner index), ...]} best first.
+
+    `items` is a list of packed items (see pack_item) built with the same
+    `target_ids`. Only pairs holding every target mod between them are
+    scored; items with no such partner are left out.
+    """
+    goal = (1 << len(set(target_ids))) - 1
+    workers = workers or os.cpu_count() or 1
+    chunks = chunk_rows(len(items), pairs_per_chunk)
+    merged = {}
+    if workers == 1:
+        _init_worker(items, cache_size, goal)
+        results = (_search_rows(rows, top_k) for rows in chunks)
+        for heaps in results:
+            for item, heap in heaps.items(): merged.setdefault(item, []).extend(heap)
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(items, cache_size, goal)) as pool:
+            for heaps in pool.map(_search_rows, chunks, [top_k] * len(chunks)):
+                for item, heap in heaps.items(): merged.setdefault(item, []).extend(heap)
+    return {item: heapq.nlargest(top_k, candidates) for item, candidates in sorted(merged.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the best recombination partner for each item in a stash dump.')
+    parser.add_argument('dump', help='text file with items copied using Ctrl+Alt+C')
+    parser.add_argument('--target', action='append', required=True,
+                        help='target mod, numbers written as # (repeat for each mod)')
+    parser.add_argument('--top', type=int, default=3, help='partners to keep per item')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--chunk', type=int, default=20000, help='pairs per work unit')
+    parser.add_argument('--registry', help='mod registry JSON to load and update')
+    args = parser.parse_args(argv)
+
+    registry = ModRegistry.open(args.registry) if args.registry else default_registry
+    target_ids = {registry.register(t) for t in args.target}
+    parsed = list(iter_items_from_path(args.dump, registry=registry))
+    items = [pack_item(p, target_ids, registry) for p in parsed]
+    if args.registry: registry.save(args.registry)
+    results = search_pairs(items, target_ids, args.top, args.workers, args.chunk)
+    for item, partners in results.items():
+        label = parsed[item].name or f'item {item}'
+        best = ', '.join(f'{parsed[j].name or j} {prob * 100:.2f}%' for prob, j in partners)
+        print(f'{label}: {best}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Cheapest sequence of recombinations that reaches a target item.
+
+Items are reduced to a signature: which target mods they hold (one bit per
+target prefix 0-2 and suffix 3-5) plus how many other prefixes/suffixes they
+carry. Items with the same signature are interchangeable for the engine, so
+only the cheapest pool item per signature is kept (dominance pruning).
+
+One step combines two items with a chosen set of desired target mods; its
+success probability comes from `engine.evaluate` and, since both inputs are
+consumed on every attempt, its expected cost is (cost_a + cost_b) / p. A
+successful step is modelled as an item holding exactly the desired mods and
+no filler. Because a product always costs more than either input, the search
+settles signatures cheapest first (Knuth's generalisation of Dijkstra) and
+the first settled item holding every target is optimal under this model.
+Probabilities are memoized per (signature, signature, desired) and the sides
+share one LRU side cache.
+
+    python planner.py dump.txt --prefix "+# to maximum Life" --suffix "#% increased Attack Speed"
+"""
+import argparse
+import heapq
+from collections import namedtuple
+
+from cache import LRUCache
+from engine import DESIRED, PREFIX, SUFFIX, Affix, Scenario, evaluate_scenario, intern_mod
+from registry import normalize
+
+Craft = namedtuple('Craft', 'cost signature item step')   # item: pool index, or None when crafted
+Step = namedtuple('Step', 'left right desired probability cost')
+Plan = namedtuple('Plan', 'cost final steps')
+
+SUFFIX_SHIFT = 3
+
+
+def _subsets(mask):
+    sub = mask
+    while sub:
+        yield sub
+        sub = (sub - 1) & mask
+
+
+class Planner:
+    def __init__(self, prefixes, suffixes, side_cache=None):
+        if len(prefixes) > 3 or len(suffixes) > 3: raise ValueError('a target can have at most 3 prefixes and 3 suffixes')
+        self.targets = [None] * 6
+        for i, mod in enumerate(prefixes): self.targets[i] = (PREFIX, normalize(mod))
+        for i, mod in enumerate(suffixes): self.targets[SUFFIX_SHIFT + i] = (SUFFIX, normalize(mod))
+        self.bit_of = {t: i for i, t in enumerate(self.targets) if t is not None}
+        self.goal = (1 << len(prefixes)) - 1 | ((1 << len(suffixes)) - 1) << SUFFIX_SHIFT
+        self.side_cache = side_cache if side_cache is not None else LRUCache()
+        self.probabilities = {}
+        self.halves = {}
+
+    def signature(self, affixes):
+        """(held target mask, other prefixes, other suffixes) of an item."""
+        held, fillers = 0, {PREFIX: 0, SUFFIX: 0}
+        for affix in affixes:
+            bit = self.bit_of.get((affix.type, normalize(affix.mod)))
+            if bit is None: fillers[affix.type] += 1
+            else: held |= 1 << bit
+        return held, fillers[PREFIX], fillers[SUFFIX]
+
+    def _half(self, signature, item_num):
+        """6 Scenario slots (prefixes, then suffixes) for one item and the target bit held in each slot."""
+        half = self.halves.get((signature, item_num))
+        if half is None:
+            held, prefix_fillers, suffix_fillers = signature
+            mods, bits = [], []
+            for offset, fillers, kind in ((0, prefix_fillers, 'p'), (SUFFIX_SHIFT, suffix_fillers, 's')):
+                side = [(intern_mod(self.targets[i][1]), i) for i in range(offset, offset + 3) if held >> i & 1]
+                side += [(intern_mod(f'(filler {item_num}{kind}{k})'), None) for k in range(fillers)]
+                side += [(0, None)] * (3 - len(side))
+                mods += [mod for mod, _ in side]
+                bits += [bit for _, bit in side]
+            half = self.halves[(signature, item_num)] = (tuple(mods), tuple(bits))
+        return half
+
+    def probability(self, sig_a, sig_b, desired):
+        if sig_b < sig_a: sig_a, sig_b = sig_b, sig_a     # no desired base: the order does not matter
+        key = (sig_a, sig_b, desired)
+        prob = self.probabilities.get(key)
+        if prob is None:
+            mods_a, bits_a = self._half(sig_a, 1)
+            mods_b, bits_b = self._half(sig_b, 2)
+            flags = 0
+            for slot, bit in enumerate(bits_a + bits_b):
+                if bit is not None and desired >> bit & 1: flags |= 1 << slot
+            prob, error_code = evaluate_scenario(Scenario(mods_a + mods_b, flags << DESIRED), self.side_cache)
+            prob = self.probabilities[key] = 0.0 if error_code else prob
+        return prob
+
+    def plan(self, items, costs=None):
+        """Return the cheapest Plan reaching the target from `items` (Affix sequences), or None."""
+        frontier = {}
+        for index, affixes in enumerate(items):
+            cost = 1.0 if costs is None else costs[index]
+            signature = self.signature(affixes)
+            if not signature[0]: continue     # holds no target mod, so it can never contribute one
+            if signature not in frontier or cost < frontier[signature].cost:
+                frontier[signature] = Craft(cost, signature, index, None)
+
+        heap = [(craft.cost, signature) for signature, craft in frontier.items()]
+        heapq.heapify(heap)
+        settled = {}
+        best_goal = min((c.cost for s, c in frontier.items() if s[0] & self.goal == self.goal), default=float('inf'))
+        while heap:
+            cost, signature = heapq.heappop(heap)
+            if signature in settled or cost > frontier[signature].cost: continue
+            craft = settled[signature] = frontier[signature]
+            if signature[0] & self.goal == self.goal:
+                return Plan(craft.cost, craft, _steps(craft))
+
+            for other in list(settled.values()):
+                if craft.cost + other.cost >= best_goal: continue
+                held_a, held_b = signature[0], other.signature[0]
+                for desired in _subsets(held_a | held_b):
+                    if desired & held_a == desired or desired & held_b == desired: continue
+                    product = (desired, 0, 0)
+                    if product in settled: continue
+                    prob = self.probability(signature, other.signature, desired)
+                    if not prob: continue
+                    product_cost = (craft.cost + other.cost) / prob
+                    if product_cost >= best_goal: continue
+                    if product not in frontier or product_cost < frontier[product].cost:
+                        frontier[product] = Craft(product_cost, product, None, (craft, other, prob))
+                        heapq.heappush(heap, (product_cost, product))
+                        if desired & self.goal == self.goal: best_goal = product_cost
+        return None
+
+    def describe(self, signature):
+        held, prefix_fillers, suffix_fillers = signature
+        mods = [self.targets[i][1] for i in range(6) if held >> i & 1]
+        if prefix_fillers or suffix_fillers: mods.append(f'+{prefix_fillers}P/{suffix_fillers}S other')
+        return ', '.join(mods) or 'no target mods'
+
+
+def _steps(craft):
+    """Crafting steps in execution order (inputs before the item they make)."""
+    steps, stack, seen = [], [(craft, False)], set()
+    while stack:
+        node, expanded = stack.pop()
+        if node.step is None or node.signature in seen: continue
+        left, right, prob = node.step
+        if expanded:
+            seen.add(node.signature)
+            steps.append(Step(left, right, node.signature[0], prob, node.cost))
+        else:
+            stack += [(node, True), (right, False), (left, False)]
+    return steps
+
+
+def main(argv=None):
+    from stash_parser import iter_items_from_path
+
+    parser = argparse.ArgumentParser(description='Plan the cheapest recombination sequence for a target item.')
+    parser.add_argument('dump', help='text file with pool items copied using Ctrl+Alt+C')
+    parser.add_argument('--prefix', action='append', default=[], help='target prefix, numbers written as #')
+    parser.add_argument('--suffix', action='append', default=[], help='target suffix, numbers written as #')
+    args = parser.parse_args(argv)
+
+    parsed = list(iter_items_from_path(args.dump))
+    items = [tuple(Affix(m.text, PREFIX) for m in p.prefixes[:3]) + tuple(Affix(m.text, SUFFIX) for m in p.suffixes[:3])
+             for p in parsed]
+    planner = Planner(args.prefix, args.suffix)
+    result = planner.plan(items)
+    if result is None:
+        print('the target cannot be reached from this pool')
+        return
+
+    def label(node):
+        return f'item {parsed[node.item].name or node.item}' if node.item is not None else planner.describe(node.signature)
+    for n, step in enumerate(result.steps, 1):
+        print(f'{n}. [{label(step.left)}] + [{label(step.right)}] -> {planner.describe((step.desired, 0, 0))} '
+              f'(p={step.probability * 100:.2f}%, expected cost {step.cost:.2f})')
+    if not result.steps: print(f'{label(result.final)} already has every target mod')
+    print(f'expected total cost: {result.cost:.2f} items')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Modifier registry: stable integer ids for mod texts.
+
+`ModRegistry.intern` gives every distinct mod string an integer id (0 is
+reserved for the empty slot) and keeps an index from text to id. `register`
+first normalizes a parsed modifier line, dropping tiers, value ranges and
+rolled numbers, so '+40(35–44) to maximum Life' and '+38 to maximum Life'
+share one id. A registry saved with `save` and reopened with `load` keeps
+every id, so ids can be stored and joined against other mod databases.
+
+The planner and pair search intern their mod strings in `default_registry`;
+`Scenario.from_request` numbers request mods per call and does not touch it.
+"""
+import json
+import os
+import re
+
+FORMAT_VERSION = 1
+
+_TIER_TOKEN = re.compile(r'\s*T\d+\s*')
+_RANGE_TOKEN = re.compile(r'\s*\(\d+–\d+\)')
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    """Mod identity without tier, ranges or rolled values: '+40(35–44) to maximum Life' -> '+# to maximum Life'."""
+    text = _RANGE_TOKEN.sub('', _TIER_TOKEN.sub(' ', text))
+    return _SPACES.sub(' ', _NUMBER.sub('#', text)).strip()
+
+
+class ModRegistry:
+    def __init__(self, names=()):
+        self.names = ['']
+        self.index = {}
+        for name in names: self.intern(name)
+
+    def __len__(self):
+        return len(self.names) - 1
+
+    def __contains__(self, text):
+        return text in self.index
+
+    def intern(self, text):
+        """Id of `text` as given, assigning the next id on first sight."""
+        mod_id = self.index.get(text)
+        if mod_id is None:
+            mod_id = self.index[text] = len(self.names)
+            self.names.append(text)
+        return mod_id
+
+    def register(self, text):
+        """Id of the normalized form of a parsed modifier line."""
+        return self.intern(normalize(text))
+
+    def lookup(self, text):
+        """Id of `text` if known, else None (never assigns)."""
+        return self.index.get(text)
+
+    def name(self, mod_id):
+        return self.names[mod_id]
+
+    def save(self, path):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': FORMAT_VERSION, 'mods': self.names[1:]}, f, ensure_ascii=False, indent=0)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} mod registry')
+        return cls(data['mods'])
+
+    @classmethod
+    def open(cls, path):
+        """Load `path` if it exists, otherwise start an empty registry."""
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+default_registry = ModRegistry()
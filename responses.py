@@ -0,0 +1,23 @@
+"""JSON result bodies shared by the HTTP service and the CLI.
+
+A result is {"probability": p} or {"error": {"code": ..., "message": ...}};
+codes are the stable engine error codes (the keys of `translations`) plus the
+request-level codes below, and messages are localized when a translation
+exists. The translations are only imported once an error is reported.
+"""
+ERROR_INVALID_REQUEST = 'invalid_request'
+ERROR_NOT_FOUND = 'not_found'
+ERROR_INTERNAL = 'error_runtime'      # a translation key, so the message is localized
+
+
+def error_body(code, language='English', message=None):
+    """Error body for `code`; `message` overrides the translated text (e.g. a parse error)."""
+    if message is None:
+        from translations import translations
+        messages = translations.get(language, translations['English'])
+        message = messages.get(code, code)
+    return {'error': {'code': code, 'message': message}}
+
+def result_body(result, language='English'):
+    prob, error_code = result
+    return error_body(error_code, language) if error_code else {'probability': prob}
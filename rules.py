@@ -0,0 +1,119 @@
+"""Recombination rule tables, loaded from versioned JSON files.
+
+A ruleset (see `rulesets/v1.json`) holds the outcome count distribution per
+mod count, the base weight, the exclusive-mod policy (at most `max_total`
+exclusive mods, `max_desired` of them desired, the `cross_probability` of the
+1P/1S cross case) and the non-native policy. `load_rules` reads a file once
+and compiles it into an immutable `Rules` with the derived tables the engine
+uses (sorted count pairs, exact fractions).
+
+Every ruleset has a small integer `key_id`, unique among loaded rulesets and
+stable across processes. The engine stores it above the bits of
+`canonical_side_key`, so side caches and lookup tables never mix results of
+different rule versions, and several versions can be evaluated side by side.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+
+FORMAT_VERSION = 1
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rulesets')
+DEFAULT_VERSION = 'v1'
+MAX_MOD_COUNT = 6
+RULES_SHIFT = 41          # canonical_side_key bits below this describe the side
+MAX_KEY_ID = (1 << 22) - 1
+_VERSION_NAME = re.compile(r'[\w-][\w.-]*')
+
+
+@dataclass(frozen=True, eq=False)
+class Rules:
+    version: str
+    key_id: int
+    description: str
+    # [mod count] -> ((outcome count, probability), ...) in ascending outcome order
+    count_probabilities: tuple
+    exact_count_probabilities: tuple
+    base_weight: float
+    exact_base_weight: Fraction
+    max_exclusive: int
+    max_desired_exclusive: int
+    cross_probability: float
+    exact_cross_probability: Fraction
+    non_native_drops: bool
+
+    @property
+    def key_bits(self):
+        return self.key_id << RULES_SHIFT
+
+
+_by_id = {}
+_by_version = {}
+
+
+def _exact(value):
+    # The decimal as written (0.667 -> 667/1000), not the binary float.
+    return Fraction(repr(value))
+
+def compile_rules(data, source='<ruleset>'):
+    """Validate a decoded ruleset and return the registered Rules; `source` (the file) names it in errors."""
+    if data.get('format') != FORMAT_VERSION: raise ValueError(f'{source}: not a format {FORMAT_VERSION} ruleset')
+    version, key_id = str(data['version']), data['key_id']
+    if not isinstance(key_id, int) or not 0 <= key_id <= MAX_KEY_ID: raise ValueError(f'{version}: bad key_id {key_id!r}')
+
+    count_probabilities = data['count_probabilities']
+    counts = []
+    for count in range(MAX_MOD_COUNT + 1):
+        # With no mods the outcome can only be empty, so "0" may be left out.
+        written = count_probabilities.get(str(count), {'0': 1.0} if count == 0 else None)
+        if written is None: raise ValueError(f'{source}: ruleset {version} has no outcome distribution for {count} mods')
+        distribution = sorted((int(outcome), float(prob)) for outcome, prob in written.items())
+        if any(not 0 <= outcome <= min(count, 3) or prob < 0 for outcome, prob in distribution):
+            raise ValueError(f'{version}: bad outcome distribution for {count} mods')
+        if abs(sum(prob for _, prob in distribution) - 1.0) > 1e-9:
+            raise ValueError(f'{version}: outcome probabilities for {count} mods do not sum to 1')
+        counts.append(tuple(distribution))
+
+    exclusive, non_native = data['exclusive'], data['non_native']
+    rules = Rules(
+        version=version, key_id=key_id, description=data.get('description', ''),
+        count_probabilities=tuple(counts),
+        exact_count_probabilities=tuple(tuple((outcome, _exact(prob)) for outcome, prob in c) for c in counts),
+        base_weight=float(data['base_weight']), exact_base_weight=_exact(float(data['base_weight'])),
+        max_exclusive=int(exclusive['max_total']), max_desired_exclusive=int(exclusive['max_desired']),
+        cross_probability=float(exclusive['cross_probability']),
+        exact_cross_probability=_exact(float(exclusive['cross_probability'])),
+        non_native_drops=bool(non_native['drop_on_losing_base']),
+    )
+
+    existing = _by_id.get(key_id)
+    if existing is not None:
+        if existing.version != version: raise ValueError(f'{version}: key_id {key_id} is taken by {existing.version}')
+        return existing
+    if version in _by_version: raise ValueError(f'{version} is already loaded with key_id {_by_version[version].key_id}')
+    _by_id[key_id] = _by_version[version] = rules
+    return rules
+
+def load_rules(path):
+    with open(path, encoding='utf-8') as f:
+        return compile_rules(json.load(f), path)
+
+def get_rules(version=DEFAULT_VERSION):
+    """Rules for `version`, loaded from RULES_DIR on first use."""
+    rules = _by_version.get(version)
+    if rules is None:
+        path = os.path.join(RULES_DIR, f'{version}.json')
+        if not _VERSION_NAME.fullmatch(version) or not os.path.exists(path):
+            raise ValueError(f'unknown ruleset {version!r}')
+        rules = load_rules(path)
+    return rules
+
+def rules_by_id(key_id):
+    return _by_id[key_id]
+
+def available_versions():
+    return sorted(name[:-5] for name in os.listdir(RULES_DIR) if name.endswith('.json'))
+
+
+DEFAULT_RULES = get_rules()
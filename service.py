@@ -0,0 +1,254 @@
+"""HTTP/JSON calculation service (ASGI).
+
+    POST /evaluate   one scenario object, or a list of them
+    GET  /health
+    GET  /metrics    instrumentation snapshot (see `metrics`; start with --metrics)
+
+A scenario looks like
+
+    {"item1": [{"mod": "+# to maximum Life", "type": "prefix", "desired": true}],
+     "item2": [{"mod": "#% increased Attack Speed", "type": "suffix", "desired": true}],
+     "base": 0}
+
+with optional `exclusive`, `non_native` and `not_desired` flags per affix and
+`base` 0 (any), 1 or 2. Each result is {"probability": p} or
+{"error": {"code": ..., "message": ...}} (see `responses`); messages follow
+`?lang=` (default English).
+`?rules=<version>` evaluates with another ruleset from `rulesets/` (default v1).
+
+Requests that arrive within `BATCH_WINDOW` seconds of each other are
+coalesced by `MicroBatcher` into batches of at most `MAX_BATCH` rows, which
+`batch.evaluate_scenarios` runs on a worker thread against one shared side
+cache, so rows of a batch share their prefix/suffix sub-problems and the
+event loop stays free. Large requests are split across batches, round robin
+with the others, so one big POST cannot hold every other connection behind
+it. A request whose evaluation raises fails on its own (HTTP 500) without
+holding up the rest of its batch.
+
+    python service.py --port 8000        # needs uvicorn
+"""
+import argparse
+import asyncio
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import metrics
+from batch import evaluate_scenarios
+from cache import LRUCache
+from engine import Scenario, request_from_dict as parse_request
+from responses import ERROR_INTERNAL, ERROR_INVALID_REQUEST, ERROR_NOT_FOUND, error_body, result_body
+from rules import DEFAULT_VERSION, get_rules
+
+BATCH_WINDOW = 0.002
+MAX_BATCH = 512
+MAX_SCENARIOS_PER_REQUEST = 10000
+
+
+class _Job:
+    """One submitted request list, evaluated over one or more batches."""
+    __slots__ = ('requests', 'future', 'rules', 'results')
+
+    def __init__(self, requests, future, rules):
+        self.requests = requests
+        self.future = future
+        self.rules = rules
+        self.results = []
+
+
+class MicroBatcher:
+    """Coalesces concurrent evaluations into batches run off the event loop over one side cache.
+
+    A batch takes at most `max_batch` rows, an equal share from every
+    waiting request first: a request with more rows is split over several
+    batches, and requests that arrive meanwhile get rows in the next one. Batches run one at a time
+    on a single worker thread, so the side cache is never shared between
+    threads and the event loop keeps serving other connections.
+    """
+
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH, side_cache=None):
+        self.window = window
+        self.max_batch = max_batch
+        self.side_cache = side_cache if side_cache is not None else LRUCache()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix='batch')
+        self.pending = deque()
+        self.queued = 0
+        self.timer = None
+        self.running = False
+        self.batches = 0
+        self.evaluated = 0
+
+    def submit(self, requests, rules=None):
+        """Queue requests and return a future resolving to their (probability, error_code) results."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not requests:
+            future.set_result([])
+            return future
+        self.pending.append(_Job(requests, future, rules))
+        self.queued += len(requests)
+        if self.running: return future          # the running batch starts the next one
+        if self.queued >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def _take(self):
+        """Up to max_batch rows as (job, start, stop) segments; unfinished jobs stay queued."""
+        jobs = [job for job in self.pending if not job.future.done()]     # skip cancelled / failed ones
+        self.pending.clear()
+        if not jobs: return []
+        budget, share = self.max_batch, max(1, self.max_batch // len(jobs))
+        stops = {}
+        for job in jobs:        # an equal share first, so a big request cannot starve the small ones
+            stops[job] = len(job.results) + min(len(job.requests) - len(job.results), share, budget)
+            budget -= stops[job] - len(job.results)
+        for job in jobs:        # then what is left, in arrival order
+            extra = min(len(job.requests) - stops[job], budget)
+            stops[job] += extra
+            budget -= extra
+        self.pending.extend(job for job in jobs if stops[job] < len(job.requests))
+        self.queued = sum(len(job.requests) - stops[job] for job in self.pending)
+        return [(job, len(job.results), stop) for job, stop in stops.items() if stop > len(job.results)]
+
+    def flush(self):
+        """Start a batch of the waiting rows on the worker thread."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.running: return
+        segments = self._take()
+        if not segments: return
+        self.running = True
+        loop = asyncio.get_running_loop()
+        batch = loop.run_in_executor(self.executor, self._evaluate, segments)
+        batch.add_done_callback(lambda done: self._finish(segments, done.result()))
+
+    def _evaluate(self, segments):
+        # Worker thread. Side keys carry the ruleset id, so one cache serves every ruleset.
+        outcomes = []
+        for job, start, stop in segments:
+            try:
+                scenarios = [Scenario.from_request(request) for request in job.requests[start:stop]]
+                outcomes.append(evaluate_scenarios(scenarios, self.side_cache, job.rules).results())
+            except Exception as exc:    # fail this request only, not the whole batch
+                outcomes.append(exc)
+        return outcomes
+
+    def _finish(self, segments, outcomes):
+        self.running = False
+        self.batches += 1
+        for (job, start, stop), outcome in zip(segments, outcomes):
+            if job.future.done(): continue
+            if isinstance(outcome, Exception):
+                job.future.set_exception(outcome)
+                continue
+            job.results.extend(outcome)
+            self.evaluated += stop - start
+            if len(job.results) == len(job.requests): job.future.set_result(job.results)
+        # Waiting rows have sat through at least one batch already: start the next one now.
+        if self.pending: self.flush()
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'): return body
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class CalculatorApp:
+    def __init__(self, batcher=None):
+        self.batcher = batcher
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http': return
+        if self.batcher is None: self.batcher = MicroBatcher()
+
+        query = parse_qs(scope.get('query_string', b'').decode())
+        language = query.get('lang', ['English'])[0]
+        path, method = scope['path'], scope['method']
+
+        if path == '/health' and method == 'GET':
+            await _send_json(send, 200, {'status': 'ok', 'batches': self.batcher.batches,
+                                         'evaluated': self.batcher.evaluated})
+            return
+        if path == '/metrics' and method == 'GET':
+            probe = metrics.active()
+            await _send_json(send, 200, {'enabled': probe is not None, 'batches': self.batcher.batches,
+                                         'evaluated': self.batcher.evaluated,
+                                         'side_cache': self.batcher.side_cache.stats(),
+                                         'engine': probe.snapshot() if probe is not None else None})
+            return
+        if path != '/evaluate' or method != 'POST':
+            await _send_json(send, 404, error_body(ERROR_NOT_FOUND, language))
+            return
+
+        try:
+            payload = json.loads(await _read_body(receive))
+            single = not isinstance(payload, list)
+            scenarios = [payload] if single else payload
+            if len(scenarios) > MAX_SCENARIOS_PER_REQUEST: raise ValueError('too many scenarios')
+            with metrics.stage('parse'):
+                requests = [parse_request(obj) for obj in scenarios]
+            rules = get_rules(query.get('rules', [DEFAULT_VERSION])[0])
+        except ValueError as exc:   # includes json.JSONDecodeError and unknown rulesets
+            await _send_json(send, 400, error_body(ERROR_INVALID_REQUEST, language, str(exc)))
+            return
+
+        try:
+            results = [result_body(r, language) for r in await self.batcher.submit(requests, rules)]
+        except Exception:
+            await _send_json(send, 500, error_body(ERROR_INTERNAL, language))
+            return
+        await _send_json(send, 200, results[0] if single else results)
+
+
+app = CalculatorApp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the recombinator engine over HTTP/JSON.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--window-ms', type=float, default=BATCH_WINDOW * 1000, help='micro-batching window')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--store', help='persistent result store shared by all workers (see store.py)')
+    parser.add_argument('--metrics', action='store_true', help='instrument the engine and serve GET /metrics')
+    parser.add_argument('--slow-ms', type=float, help='log scenarios slower than this as JSON (implies --metrics)')
+    parser.add_argument('--profile-every', type=int, default=0,
+                        help='cProfile every Nth evaluation into /metrics (implies --metrics)')
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    if args.metrics or args.slow_ms or args.profile_every:
+        logging.basicConfig(format='%(message)s')
+        metrics.enable(args.slow_ms, args.profile_every)
+    side_cache = None
+    if args.store:
+        from store import ResultStore
+        side_cache = ResultStore(args.store)
+    app.batcher = MicroBatcher(args.window_ms / 1000, args.max_batch, side_cache)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Persistent side-probability store shared by worker processes.
+
+Results are keyed like every side cache, by `engine.canonical_side_key`; the
+ruleset's key_id sits in the top bits of the key, so one store holds several
+rule versions without mixing them. Two files:
+
+* `<path>`      append-only log of (uint64 key, float64 probability) records.
+  Every process appends the sides it had to compute; records are 16 bytes
+  and written with a single O_APPEND write, so workers can share one log.
+* `<path>.idx`  sorted index: header, then the sorted uint64 keys, then the
+  float64 values in the same order. It covers the log up to `log_size`
+  bytes and is rebuilt by `compact()` (written aside, then renamed).
+
+`ResultStore(path)` maps the index read-only and binary-searches it in
+place, so opening costs nothing per entry and all workers share the same
+pages; only log records newer than the index are read into a dict.
+`refresh()` picks up records other processes appended since; `get` calls it
+on a miss, at most once every `refresh_interval` seconds, so long-running
+workers see each other's results without compacting. A new log is created
+with its header in one step (written aside, then hard-linked into place), so
+workers opening it together never append a second header; a log whose
+records are not whole is rejected.
+
+A store is a `side_cache`: `engine.evaluate(request, store)` looks a side up
+before computing it and appends what it computes. It holds float results
+only; do not pass it with `exact=True`.
+
+    python store.py results.rcs            # compact the log into the index
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from time import monotonic
+
+LOG_MAGIC = b'RCRS'
+INDEX_MAGIC = b'RCRI'
+FORMAT_VERSION = 1
+LOG_HEADER = struct.Struct('<4sI')        # magic, format version
+INDEX_HEADER = struct.Struct('<4sIQQ')    # magic, format version, entry count, log bytes covered
+RECORD = struct.Struct('<Qd')             # canonical side key, probability
+REFRESH_INTERVAL = 1.0                    # seconds between refreshes triggered by misses
+
+
+def _read_records(data):
+    keys, values = [], []
+    for key, value in RECORD.iter_unpack(data):
+        keys.append(key)
+        values.append(value)
+    return keys, values
+
+def _create_log(path):
+    """Create the log with its header unless it exists; other processes never see it without one."""
+    fd, tmp = tempfile.mkstemp(prefix=f'{os.path.basename(path)}.', suffix='.tmp',
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        os.write(fd, LOG_HEADER.pack(LOG_MAGIC, FORMAT_VERSION))
+        os.close(fd)
+        os.link(tmp, path)          # atomic; fails if another process created the log first
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+
+
+class ResultStore:
+    def __init__(self, path, refresh_interval=REFRESH_INTERVAL):
+        self.path = path
+        self.index_path = f'{path}.idx'
+        self.refresh_interval = refresh_interval
+        self.tail = {}
+        self.appended = 0
+        self.hits = self.misses = 0
+        self._map = None
+        self._keys = self._values = ()
+        self._open_index()
+        if not os.path.exists(path): _create_log(path)
+        with open(path, 'rb') as f:
+            magic, version = LOG_HEADER.unpack(f.read(LOG_HEADER.size).ljust(LOG_HEADER.size, b'\0'))
+        if magic != LOG_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} result log')
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        self.refresh()
+
+    def _open_index(self):
+        self.close_index()
+        self.log_offset = LOG_HEADER.size
+        if not os.path.exists(self.index_path): return
+        with open(self.index_path, 'rb') as f:
+            magic, version, count, log_size = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{self.index_path} is not a version {FORMAT_VERSION} result index')
+            if count:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                view = memoryview(self._map)
+                start = INDEX_HEADER.size
+                self._keys = view[start:start + 8 * count].cast('Q')
+                self._values = view[start + 8 * count:start + 16 * count].cast('d')
+        self.log_offset = log_size
+
+    def close_index(self):
+        if self._map is not None:
+            self._keys.release()
+            self._values.release()
+            self._keys = self._values = ()
+            self._map.close()
+            self._map = None
+
+    def close(self):
+        self.close_index()
+        os.close(self._fd)
+
+    def refresh(self):
+        """Read log records appended (by any process) since the last refresh."""
+        self.refreshed = monotonic()
+        with open(self.path, 'rb') as f:
+            f.seek(self.log_offset)
+            data = f.read()
+        if len(data) % RECORD.size:
+            raise ValueError(f'{self.path} is corrupt: {self.log_offset + len(data)} bytes is not a header '
+                             f'plus whole {RECORD.size}-byte records')
+        keys, values = _read_records(data)
+        self.tail.update(zip(keys, values))
+        self.log_offset += len(data)
+
+    # -------------------------
+    # side_cache interface
+    # -------------------------
+    def __len__(self):
+        return len(self._keys) + sum(1 for key in self.tail if not self._indexed(key))
+
+    def _indexed(self, key):
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def _lookup(self, key):
+        value = self.tail.get(key)
+        if value is None:
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key: value = self._values[i]
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        if value is None and self.refresh_interval is not None and monotonic() - self.refreshed >= self.refresh_interval:
+            # Başka bir worker bu sonucu yazmış olabilir.
+            self.refresh()
+            value = self._lookup(key)
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        return key in self.tail or self._indexed(key)
+
+    def __setitem__(self, key, value):
+        if key in self.tail: return
+        self.tail[key] = value
+        os.write(self._fd, RECORD.pack(key, value))
+        self.appended += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'size': len(self), 'indexed': len(self._keys), 'appended': self.appended, 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    # -------------------------
+    # Index maintenance
+    # -------------------------
+    def compact(self):
+        """Merge the whole log into a new sorted index and switch to it."""
+        self.refresh()
+        merged = dict(zip(self._keys, self._values))
+        merged.update(self.tail)
+        keys = array('Q', sorted(merged))
+        tmp = f'{self.index_path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, len(keys), self.log_offset))
+            keys.tofile(f)
+            array('d', (merged[k] for k in keys)).tofile(f)
+        self.close_index()
+        os.replace(tmp, self.index_path)
+        self._open_index()
+        self.tail = {}
+        self.refresh()
+        return len(keys)
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'results.rcs'
+    store = ResultStore(path)
+    print(f'indexed {store.compact()} entries from {path}')
+    store.close()
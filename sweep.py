@@ -0,0 +1,92 @@
+"""What-if sweep: every single-flag change of a scenario, ranked.
+
+`sweep(request)` toggles each flag (desired, not desired, exclusive,
+non-native) of every filled affix slot and tries each other base choice,
+evaluates all variants in one call and returns them best first. Variants
+are built by flipping one bit of the packed `engine.Scenario` and never go
+back through request parsing:
+
+- validation shares a memo across the variants (`_check_scenario(...,
+  memo)`), so the desired-mod checks only rerun when a flip changes the
+  masks they read (Desired, a non-native bit they use, the base) and the
+  exclusive checks only when Exclusive, Desired or the base change;
+- a flip changes the side key of one mod on one side only, so the variant's
+  key is the base key plus that mod's term difference (`_mod_key_term`),
+  and the other side's probability is reused as is.
+"""
+from collections import namedtuple
+from operator import attrgetter
+
+from engine import (BASE_ANY, BASE_ITEM1, BASE_ITEM2, DESIRED, EXCLUSIVE, NON_NATIVE, NOT_DESIRED, PREFIX_SLOTS,
+                    SLOTS, SUFFIX_SLOTS, DEFAULT_RULES, Scenario, _check_scenario, _key_probability, _mod_key_term,
+                    _scenario_masks, _scenario_side_key, _SLOTS_OF)
+
+FLAGS = (('desired', DESIRED), ('not_desired', NOT_DESIRED), ('exclusive', EXCLUSIVE), ('non_native', NON_NATIVE))
+
+# item/slot are None for base variants; slot is the UI slot on the item (0-2 prefixes, 3-5 suffixes).
+Variant = namedtuple('Variant', 'field item slot mod value probability error_code delta')
+SweepResult = namedtuple('SweepResult', 'probability error_code variants')
+
+_probability = attrgetter('probability')
+
+
+def sweep(request, side_cache=None, rules=None):
+    """Evaluate `request` and all its single-flag variants; variants come back ranked."""
+    if side_cache is None: side_cache = {}
+    if rules is None: rules = DEFAULT_RULES
+    memo = {}
+
+    ids = {}
+    scenario = Scenario.from_request(request, ids)
+    mod_name = {mod_id: text for text, mod_id in ids.items()}
+    mods, present = scenario.mods, scenario.present
+    _, non_native, _, desired, not_desired = _scenario_masks(scenario, rules)
+    base_masks = (non_native, desired, not_desired)
+    # Side keys of the unchanged scenario, valid or not; variants are deltas on these.
+    keys = {side_slots: _scenario_side_key(mods, present, non_native, desired, not_desired, side_slots,
+                                           scenario.base) | rules.key_bits
+            for side_slots in (PREFIX_SLOTS, SUFFIX_SLOTS)}
+
+    def evaluate(changed, base_shift=0):
+        result, masks = _check_scenario(changed, False, rules, memo)
+        if masks is None: return result
+        return (_key_probability(keys[PREFIX_SLOTS] + base_shift, side_cache, False) *
+                _key_probability(keys[SUFFIX_SLOTS] + base_shift, side_cache, False)), None
+
+    def evaluate_flip(changed, side_slots, instances, term):
+        # Only the flipped slot's mod term on its own side can change; the other side is reused.
+        result, masks = _check_scenario(changed, False, rules, memo)
+        if masks is None: return result
+        key = keys[side_slots] if masks == base_masks else keys[side_slots] - term + _mod_key_term(instances, *masks)
+        other = keys[SUFFIX_SLOTS if side_slots == PREFIX_SLOTS else PREFIX_SLOTS]
+        return _key_probability(key, side_cache, False) * _key_probability(other, side_cache, False), None
+
+    prob, error_code = evaluate(scenario)
+    reference = prob if error_code is None else None
+
+    variants = []
+    flags, base = scenario.flags, scenario.base
+    for i in _SLOTS_OF[present]:
+        item, slot, mod = i // 6 + 1, i % 6, mod_name[mods[i]]
+        side_slots = PREFIX_SLOTS if PREFIX_SLOTS >> i & 1 else SUFFIX_SLOTS
+        instances = 0
+        for j in _SLOTS_OF[present & side_slots]:
+            if mods[j] == mods[i]: instances |= 1 << j
+        term = _mod_key_term(instances, *base_masks)
+        for field, shift in FLAGS:
+            bit = 1 << (i + shift)
+            p, code = evaluate_flip(Scenario(mods, flags ^ bit, base, present), side_slots, instances, term)
+            delta = p - reference if code is None and reference is not None else None
+            variants.append(Variant(field, item, slot, mod, not flags & bit, p, code, delta))
+    for other in (BASE_ANY, BASE_ITEM1, BASE_ITEM2):
+        if other == base: continue
+        # The base choice is bits 3-4 of both side keys.
+        p, code = evaluate(Scenario(mods, flags, other, present), (other - base) << 3)
+        delta = p - reference if code is None and reference is not None else None
+        variants.append(Variant('base', None, None, None, other, p, code, delta))
+
+    # Valid results first, highest probability first (the sort is stable, ties keep sweep
+    # order); errors keep their sweep order at the end.
+    ranked = sorted((v for v in variants if v.error_code is None), key=_probability, reverse=True)
+    ranked += [v for v in variants if v.error_code is not None]
+    return SweepResult(prob, error_code, ranked)
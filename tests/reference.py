@@ -0,0 +1,230 @@
+"""The calculator as it was before the engine rewrite, kept as a test oracle.
+
+`calculate_combined_probability(session_state)` is the original Streamlit
+function with the session state passed in and error codes returned in place
+of translated messages, so `engine.evaluate` can be diffed against it.
+"""
+from math import comb
+
+
+class _Codes(dict):
+    def __missing__(self, code): return code
+
+ERROR_CODES = _Codes()
+
+
+def get_count_probabilities(count):
+    if count == 0: return {0: 1.0}
+    if count == 1: return {0: 0.41, 1: 0.59}
+    if count == 2: return {1: 0.667, 2: 0.333}
+    if count == 3: return {1: 0.40, 2: 0.50, 3: 0.10} 
+    if count == 4: return {1: 0.10, 2: 0.60, 3: 0.30}
+    if count == 5: return {2: 0.43, 3: 0.57}
+    if count == 6: return {2: 0.30, 3: 0.70}
+    return {}
+
+def calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, winning_base):
+    available_mods = []
+    for mod_info in all_mods_list:
+        # Non-Native kuralı: Non-Native modlar, onu taşımayan base kazanırsa düşer.
+        if mod_info['non_native'] and mod_info['item'] != winning_base:
+            continue
+        available_mods.append(mod_info['mod'])
+    
+    selectable_mods_pool = list(set(available_mods))
+    
+    # İstenen modların hepsi havuzda olmalı
+    for desired in desired_mods:
+        if desired not in selectable_mods_pool: return 0.0 
+    
+    selectable_mods = [m for m in selectable_mods_pool if m not in not_desired_mods]
+    
+    if len(desired_mods) > outcome_count: return 0.0
+    
+    non_desired_selectable = [m for m in selectable_mods if m not in desired_mods]
+    total_unique_selectable = len(desired_mods) + len(non_desired_selectable)
+    
+    if total_unique_selectable < outcome_count:
+        if len(desired_mods) == total_unique_selectable: return 1.0
+        else:
+             if outcome_count > total_unique_selectable and outcome_count > 3: return 0.0
+             
+    if len(selectable_mods) < outcome_count: return 0.0 
+    
+    filled_slots = len(desired_mods)
+    remaining_slots = outcome_count - filled_slots 
+    
+    if remaining_slots < 0: return 0.0
+    if remaining_slots > len(non_desired_selectable): return 0.0
+    
+    favorable_combinations = comb(len(non_desired_selectable), remaining_slots)
+    total_combinations = comb(len(selectable_mods), outcome_count)
+    
+    if total_combinations == 0: return 0.0
+    
+    return favorable_combinations / total_combinations
+
+def calculate_modifier_probability(mods_item1, mods_item2, desired_mods, not_desired_mods, item1_base_desired, item2_base_desired):
+    
+    all_mods_list = mods_item1 + mods_item2
+    total_mod_count = len(all_mods_list)
+    
+    if total_mod_count == 0: return 0.0 if len(desired_mods) > 0 else 1.0
+
+    count_probs = get_count_probabilities(total_mod_count)
+    total_prob = 0.0
+    
+    for outcome_count, count_prob in count_probs.items():
+        if outcome_count == 0:
+            if len(desired_mods) == 0: total_prob += count_prob
+            continue
+        
+        if len(desired_mods) > outcome_count: continue
+        
+        # Base'e göre mod başarı olasılıklarını hesapla
+        prob_base1_affix = calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, 1)
+        prob_base2_affix = calculate_selection_probability(all_mods_list, desired_mods, not_desired_mods, outcome_count, 2)
+        
+        # Base Seçimi Faktörü
+        if not item1_base_desired and not item2_base_desired:
+             # Base seçili değilse: (P(Base 1) * P(Affix | B1)) + (P(Base 2) * P(Affix | B2))
+             selection_prob = (prob_base1_affix * 0.5) + (prob_base2_affix * 0.5)
+             
+        elif item1_base_desired: 
+             # Base 1 isteniyor: Olasılık yarıya iner (sizin istediğiniz kurala göre).
+             selection_prob = prob_base1_affix * 0.5
+        elif item2_base_desired: 
+             # Base 2 isteniyor: Olasılık yarıya iner.
+             selection_prob = prob_base2_affix * 0.5
+        else:
+             selection_prob = 0.0 
+
+        
+        total_prob += count_prob * selection_prob
+    
+    return total_prob
+
+def calculate_combined_probability(session_state):
+    t = ERROR_CODES
+    
+    prefixes_item1, prefixes_item2, suffixes_item1, suffixes_item2 = [], [], [], []
+    desired_prefixes, desired_suffixes, not_desired_prefixes, not_desired_suffixes = set(), set(), set(), set()
+    exclusive_mods = []
+    
+    # 1. Inputları topla ve Desired/Exclusive durumlarını kaydet
+    for i in range(6):
+        mod_type = 'prefix' if i < 3 else 'suffix'
+        
+        def process_item_input(item_num, input_key, exclusive_key, non_native_key, desired_key, not_desired_key, mod_list):
+            val = session_state.get(input_key, '').strip()
+            if not val: return
+            
+            is_exclusive = session_state.get(exclusive_key, False)
+            is_non_native = session_state.get(non_native_key, False)
+            is_desired = session_state.get(desired_key, False)
+            is_not_desired = session_state.get(not_desired_key, False)
+            
+            mod_info = {'mod': val, 'non_native': is_non_native, 'exclusive': is_exclusive, 'item': item_num, 'desired': is_desired, 'type': mod_type}
+            mod_list.append(mod_info)
+
+            if is_desired:
+                if mod_type == 'prefix': desired_prefixes.add(val)
+                else: desired_suffixes.add(val)
+            elif is_not_desired:
+                if mod_type == 'prefix': not_desired_prefixes.add(val)
+                else: not_desired_suffixes.add(val)
+                
+            if is_exclusive: exclusive_mods.append(mod_info)
+
+        # Item 1
+        process_item_input(1, f'item1_input_{i}', f'item1_check_exclusive_{i}', f'item1_check_non_native_{i}', f'item1_check_desired_{i}', f'item1_check_not_desired_{i}', prefixes_item1 if mod_type == 'prefix' else suffixes_item1)
+        
+        # Item 2
+        process_item_input(2, f'item2_input_{i}', f'item2_check_exclusive_{i}', f'item2_check_non_native_{i}', f'item2_check_desired_{i}', f'item2_check_not_desired_{i}', prefixes_item2 if mod_type == 'prefix' else suffixes_item2)
+
+    
+    # --- TEMEL HATA KONTROLLERİ ---
+    for i in range(6):
+        if session_state.get(f'item1_input_{i}') and session_state.get(f'item1_check_desired_{i}') and session_state.get(f'item1_check_not_desired_{i}'): return None, t['error_pref_conflict']
+        if session_state.get(f'item2_input_{i}') and session_state.get(f'item2_check_desired_{i}') and session_state.get(f'item2_check_not_desired_{i}'): return None, t['error_pref_conflict']
+
+    if len(desired_prefixes) > 3 or len(desired_suffixes) > 3: return None, t['error_too_many_desired']
+    if len(desired_prefixes) == 0 and len(desired_suffixes) == 0: return None, t['error_no_desired']
+    
+    
+    # --- NON-NATIVE OTOMATİK BASE SEÇİMİ VE ÇAKIŞMA KONTROLÜ (OTOMATİK SEÇİM KALDIRILDI) ---
+    
+    item1_has_non_native_desired = any(m['non_native'] and m['desired'] for m in prefixes_item1 + suffixes_item1)
+    item2_has_non_native_desired = any(m['non_native'] and m['desired'] for m in prefixes_item2 + suffixes_item2)
+
+    item1_base_desired = session_state.get('item1_base_desired', False)
+    item2_base_desired = session_state.get('item2_base_desired', False)
+    
+    # Kural: Base seçili değilken iki itemde de Non-Native Desired mod varsa hata ver.
+    if not item1_base_desired and not item2_base_desired:
+        if item1_has_non_native_desired and item2_has_non_native_desired:
+             return None, t['error_both_non_native']
+        
+        # Artık otomatik seçim yapmıyoruz. Non-Native mod varsa kullanıcı uyarılır.
+        if item1_has_non_native_desired or item2_has_non_native_desired:
+             return None, t['error_non_native_manual'] # Yeni bir hata mesajı tanımlanabilir.
+             
+    elif item1_has_non_native_desired and item2_has_non_native_desired:
+        return None, t['error_both_non_native']
+        
+    # Non-Native Çakışması Kontrolü (%0 döndürür)
+    desired_mods_all = desired_prefixes | desired_suffixes
+    
+    if item1_base_desired:
+        for mod_info in prefixes_item2 + suffixes_item2:
+            if mod_info['non_native'] and mod_info['mod'] in desired_mods_all:
+                return 0.0, None 
+
+    elif item2_base_desired:
+        for mod_info in prefixes_item1 + suffixes_item1:
+            if mod_info['non_native'] and mod_info['mod'] in desired_mods_all:
+                return 0.0, None 
+    
+    
+    # --- HARDCODED 1P/1S ÇAPRAZ İSTİSNASI ---
+    has_i1_nedp = any(m['desired'] and not m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item1)
+    has_i1_es = any(m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item1)
+    has_i2_ep = any(m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item2)
+    has_i2_neds = any(m['desired'] and not m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item2)
+    
+    is_cross_case_1 = has_i1_nedp and has_i1_es and has_i2_ep and has_i2_neds
+    is_cross_case_2 = (any(m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item1) and 
+                       any(m['desired'] and not m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item1) and
+                       any(m['desired'] and not m['exclusive'] and m['type'] == 'prefix' for m in prefixes_item2) and
+                       any(m['exclusive'] and m['type'] == 'suffix' for m in suffixes_item2))
+    
+    if is_cross_case_1 or is_cross_case_2:
+        num_exclusive_total = sum(1 for m in exclusive_mods)
+        num_desired_total = len(desired_prefixes) + len(desired_suffixes)
+        
+        if num_exclusive_total == 2 and num_desired_total == 2:
+            prob = 0.55
+            
+            if item1_base_desired or item2_base_desired:
+                return prob * 0.5, None 
+            else:
+                 return prob, None
+
+
+    # --- NORMAL EXCLUSIVE MOD SAYISI KONTROLÜ ---
+    if len(exclusive_mods) > 2:
+        return None, t['error_exclusive']
+
+    num_ex_desired = sum(1 for m in exclusive_mods if m['desired'])
+    if num_ex_desired > 1:
+        return None, t['error_exclusive']
+    
+    
+    # --- NORMAL HESAPLAMA ---
+    prefix_prob = calculate_modifier_probability(prefixes_item1, prefixes_item2, desired_prefixes, not_desired_prefixes, 
+                                                item1_base_desired, item2_base_desired)
+    suffix_prob = calculate_modifier_probability(suffixes_item1, suffixes_item2, desired_suffixes, not_desired_suffixes, 
+                                                item1_base_desired, item2_base_desired)
+    
+    total_prob = prefix_prob * suffix_prob
+    return total_prob, None
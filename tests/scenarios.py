@@ -0,0 +1,33 @@
+"""Random scenarios shared by the tests: Streamlit-style session states and the matching requests."""
+from engine import Affix, RecombinationRequest
+
+POOL = ['Life', 'Mana', 'Cold Resistance', 'Armour', 'Attack Speed', 'Critical Strike', 'Strength']
+
+
+def random_state(rng):
+    state = {}
+    for item_num in (1, 2):
+        for i in range(6):
+            state[f'item{item_num}_input_{i}'] = rng.choice(POOL) if rng.random() < 0.6 else ''
+            state[f'item{item_num}_check_exclusive_{i}'] = rng.random() < 0.12
+            state[f'item{item_num}_check_non_native_{i}'] = rng.random() < 0.12
+            state[f'item{item_num}_check_desired_{i}'] = rng.random() < 0.35
+            state[f'item{item_num}_check_not_desired_{i}'] = rng.random() < 0.15
+    draw = rng.random()
+    state['item1_base_desired'] = draw < 0.25
+    state['item2_base_desired'] = 0.25 <= draw < 0.5
+    return state
+
+def request_from_state(state):
+    items = {}
+    for item_num in (1, 2):
+        items[item_num] = tuple(Affix(
+            mod=state[f'item{item_num}_input_{i}'],
+            type='prefix' if i < 3 else 'suffix',
+            exclusive=state[f'item{item_num}_check_exclusive_{i}'],
+            non_native=state[f'item{item_num}_check_non_native_{i}'],
+            desired=state[f'item{item_num}_check_desired_{i}'],
+            not_desired=state[f'item{item_num}_check_not_desired_{i}'],
+        ) for i in range(6))
+    base = 1 if state['item1_base_desired'] else 2 if state['item2_base_desired'] else 0
+    return RecombinationRequest(item1=items[1], item2=items[2], base=base)
@@ -0,0 +1,41 @@
+import math
+import random
+
+import numpy as np
+
+from batch import evaluate_batch
+from engine import evaluate
+from tests.scenarios import POOL, random_state, request_from_state
+
+FLAGS = ('exclusive', 'non_native', 'desired', 'not_desired')
+
+
+def columns(states):
+    """evaluate_batch columns for Streamlit-style session states (slots 0-5 item 1, 6-11 item 2)."""
+    def slot_values(state, key):
+        return [state[f'item{n}_{key}_{i}'] for n in (1, 2) for i in range(6)]
+    mod_ids = [[POOL.index(mod) + 1 if mod else 0 for mod in slot_values(state, 'input')] for state in states]
+    flags = {flag: [slot_values(state, f'check_{flag}') for state in states] for flag in FLAGS}
+    base = [1 if state['item1_base_desired'] else 2 if state['item2_base_desired'] else 0 for state in states]
+    return mod_ids, flags, base
+
+
+def test_batch_matches_evaluate():
+    rng = random.Random(2)
+    states = [random_state(rng) for _ in range(2000)]
+    mod_ids, flags, base = columns(states)
+    result = evaluate_batch(np.array(mod_ids), *(np.array(flags[flag]) for flag in FLAGS), np.array(base))
+    assert len(result) == len(states)
+    for state, (prob, error_code), row_prob in zip(states, result.results(), result.probabilities):
+        assert (prob, error_code) == evaluate(request_from_state(state))
+        assert math.isnan(row_prob) if error_code else row_prob == prob
+
+def test_plain_sequences_and_shared_cache():
+    rng = random.Random(9)
+    states = [random_state(rng) for _ in range(300)]
+    mod_ids, flags, base = columns(states)
+    side_cache = {}
+    first = evaluate_batch(mod_ids, *(flags[flag] for flag in FLAGS), base, side_cache)
+    size = len(side_cache)
+    assert first.results() == evaluate_batch(mod_ids, *(flags[flag] for flag in FLAGS), base, side_cache).results()
+    assert len(side_cache) == size
@@ -0,0 +1,39 @@
+import random
+
+from cache import LRUCache, modifier_probability
+from engine import calculate_modifier_probability, evaluate, request_sides
+from tests.scenarios import random_state, request_from_state
+
+
+def test_eviction_order_and_counters():
+    cache = LRUCache(maxsize=2)
+    cache[1] = 0.1
+    cache[2] = 0.2
+    assert cache.get(1) == 0.1          # 1 is now the most recently used
+    cache[3] = 0.3                      # evicts 2
+    assert 2 not in cache and 1 in cache and 3 in cache and len(cache) == 2
+    assert cache.get(2) is None and cache.get(2, 'absent') == 'absent'
+    cache[1] = 0.15                     # overwrite refreshes 1, so 3 goes next
+    cache[4] = 0.4
+    assert list(cache.data) == [1, 4]
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+def test_small_cache_keeps_results_exact():
+    rng = random.Random(5)
+    requests = [request_from_state(random_state(rng)) for _ in range(500)]
+    cache = LRUCache(maxsize=8)
+    for request in requests:
+        assert evaluate(request, cache) == evaluate(request)
+    assert len(cache) == 8 and cache.hits + cache.misses > 0
+
+def test_modifier_probability_matches_engine():
+    rng = random.Random(6)
+    cache = LRUCache()
+    for _ in range(300):
+        request = request_from_state(random_state(rng))
+        s = request_sides(request)
+        side = (s['prefixes_item1'], s['prefixes_item2'], s['desired_prefixes'], s['not_desired_prefixes'],
+                request.base == 1, request.base == 2)
+        assert modifier_probability(*side, cache=cache) == calculate_modifier_probability(*side)
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+import cli
+from engine import evaluate, request_from_dict
+
+SCENARIO = {'item1': [{'mod': 'Life', 'desired': True}, {'mod': 'Mana'}],
+            'item2': [{'mod': 'Armour'}, {'mod': 'Speed', 'type': 'suffix', 'desired': True}]}
+
+
+def run(tmp_path, capsys, text, *args):
+    path = tmp_path / 'scenarios.json'
+    path.write_text(text, encoding='utf-8')
+    cli.main([str(path), *args])
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_json_lines_with_bad_lines(tmp_path, capsys):
+    text = '\n'.join([json.dumps(SCENARIO), '{not json', json.dumps({'item1': 3}), json.dumps({'item1': []})])
+    good, malformed, invalid, no_desired = run(tmp_path, capsys, text)
+    assert good == {'probability': evaluate(request_from_dict(SCENARIO))[0]}
+    assert malformed['error']['code'] == 'invalid_request' and invalid['error']['code'] == 'invalid_request'
+    assert no_desired['error']['code'] == 'error_no_desired'
+
+def test_list_and_language(tmp_path, capsys):
+    [english] = run(tmp_path, capsys, json.dumps([{'item1': []}]))
+    [turkish] = run(tmp_path, capsys, json.dumps({'item1': []}), '--lang', 'Turkish')
+    assert english['error']['code'] == turkish['error']['code'] == 'error_no_desired'
+    assert english['error']['message'] != turkish['error']['message']
+
+def test_unknown_rules_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        run(tmp_path, capsys, json.dumps(SCENARIO), '--rules', 'nope')
+    assert exc.value.code == 2 and "unknown ruleset 'nope'" in capsys.readouterr().err
@@ -0,0 +1,39 @@
+import math
+import random
+
+from distribution import outcome_distribution, probability_of, probability_where
+from engine import Scenario, _check_scenario, evaluate, request_from_dict, request_sides
+from rules import DEFAULT_RULES
+from tests.scenarios import random_state, request_from_state
+
+
+def special_case(request):
+    """Scenarios the engine settles outside the side model (see the distribution docstring)."""
+    result, masks = _check_scenario(Scenario.from_request(request), False, DEFAULT_RULES)
+    s = request_sides(request)
+    return masks is None or s['desired_prefixes'] & s['not_desired_prefixes'] or \
+        s['desired_suffixes'] & s['not_desired_suffixes']
+
+
+def test_probability_of_equals_evaluate():
+    rng = random.Random(7)
+    compared = 0
+    for _ in range(3000):
+        request = request_from_state(random_state(rng))
+        if special_case(request): continue
+        distribution = outcome_distribution(request)
+        assert math.isclose(sum(distribution.values()), 1.0)
+        s = request_sides(request)
+        got = probability_of(distribution, s['desired_prefixes'], s['desired_suffixes'], request.base)
+        assert math.isclose(got, evaluate(request)[0], rel_tol=1e-9, abs_tol=1e-12), request
+        compared += 1
+    assert compared > 1000
+
+def test_or_query_is_a_sum_over_one_distribution():
+    scenario = {'item1': [{'mod': 'Life'}, {'mod': 'Mana'}, {'mod': 'Res', 'type': 'suffix'}],
+                'item2': [{'mod': 'Armour'}, {'mod': 'Speed', 'type': 'suffix'}]}
+    distribution = outcome_distribution(request_from_dict(scenario))
+    life, mana = frozenset({'Life'}), frozenset({'Mana'})
+    either = probability_where(distribution, lambda key: life <= key[0][1] or mana <= key[0][1])
+    both = probability_of(distribution, {'Life', 'Mana'})
+    assert math.isclose(either, probability_of(distribution, life) + probability_of(distribution, mana) - both)
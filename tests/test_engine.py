@@ -0,0 +1,17 @@
+import random
+
+from engine import evaluate
+from tests import reference
+from tests.scenarios import random_state, request_from_state
+
+
+def test_evaluate_matches_original_calculator():
+    rng = random.Random(1)
+    outcomes = set()
+    for _ in range(5000):
+        state = random_state(rng)
+        expected = reference.calculate_combined_probability(state)
+        assert evaluate(request_from_state(state)) == expected, state
+        outcomes.add(expected[1] or ('zero' if expected[0] == 0 else 'positive'))
+    # the corpus has to reach every branch for the diff to mean anything
+    assert {'zero', 'positive', 'error_no_desired', 'error_pref_conflict', 'error_exclusive'} <= outcomes
@@ -0,0 +1,27 @@
+import math
+import random
+from fractions import Fraction
+
+from engine import evaluate, request_from_dict
+from tests.scenarios import random_state, request_from_state
+
+
+def test_exact_agrees_with_float():
+    rng = random.Random(16)
+    exact_cache = {}
+    for _ in range(2000):
+        request = request_from_state(random_state(rng))
+        prob, error_code = evaluate(request)
+        exact, exact_error = evaluate(request, exact_cache, exact=True)
+        assert exact_error == error_code
+        if error_code: continue
+        assert isinstance(exact, Fraction)
+        assert math.isclose(float(exact), prob, rel_tol=1e-12, abs_tol=1e-15)
+        assert evaluate(request, exact=True) == (exact, None)
+
+def test_exact_values():
+    life = request_from_dict({'item1': [{'mod': 'Life', 'desired': True}], 'item2': []})
+    assert evaluate(life, exact=True) == (Fraction(59, 100), None)
+    # Two prefixes, one of them desired: the 2-mod row (0.667, 0.333) read as exact decimals.
+    pair = request_from_dict({'item1': [{'mod': 'Life', 'desired': True}], 'item2': [{'mod': 'Mana'}]})
+    assert evaluate(pair, exact=True) == (Fraction(667, 1000) / 2 + Fraction(333, 1000), None)
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from engine import evaluate
+from incremental import LiveScenario
+from tests.scenarios import POOL, random_state, request_from_state
+
+FLAGS = ('exclusive', 'non_native', 'desired', 'not_desired')
+
+
+def test_widget_edits_match_evaluate():
+    rng = random.Random(8)
+    state = random_state(rng)
+    live = LiveScenario()
+    live.load(request_from_state(state))
+    for _ in range(1500):
+        item, slot = rng.choice((1, 2)), rng.randrange(6)
+        if rng.random() < 0.1:
+            base = rng.randrange(3)
+            state['item1_base_desired'], state['item2_base_desired'] = base == 1, base == 2
+            live.set_base(base)
+        elif rng.random() < 0.3:
+            mod = rng.choice(POOL + [''])
+            state[f'item{item}_input_{slot}'] = mod
+            live.set(item, slot, 'mod', mod)
+        else:
+            field = rng.choice(FLAGS)
+            value = not state[f'item{item}_check_{field}_{slot}']
+            state[f'item{item}_check_{field}_{slot}'] = value
+            live.set(item, slot, field, value)
+        assert live.request() == request_from_state(state)
+        assert live.result() == evaluate(request_from_state(state))
+
+def test_result_is_memoized_and_untouched_side_is_reused():
+    live = LiveScenario()
+    for slot, mod in ((0, 'Life'), (1, 'Mana'), (3, 'Cold Resistance'), (4, 'Attack Speed')):
+        live.set(1, slot, 'mod', mod)
+    live.set(1, 0, 'desired', True)
+    live.set(1, 3, 'desired', True)
+    live.result()
+    lookups = live.side_cache.hits + live.side_cache.misses
+    live.set(1, 0, 'desired', True)             # no change keeps the result
+    live.result()
+    assert live.side_cache.hits + live.side_cache.misses == lookups
+
+    hits = live.side_cache.hits
+    live.set(1, 4, 'not_desired', True)         # a suffix edit: the prefix side is a hit
+    assert live.result() == evaluate(live.request())
+    assert live.side_cache.hits == hits + 1
+
+def test_unknown_field():
+    with pytest.raises(ValueError):
+        LiveScenario().set(1, 0, 'colour', 'red')
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+
+from engine import calculate_modifier_probability, calculate_selection_probability, request_sides
+from kernels import available_mask, modifier_probability_batch, selection_probability_batch, side_masks
+from rules import DEFAULT_RULES
+from tests.scenarios import random_state, request_from_state
+
+
+def random_sides(seed, n):
+    """(mods_item1, mods_item2, desired, not_desired) per side, with the request's base."""
+    rng = random.Random(seed)
+    sides, bases = [], []
+    for _ in range(n):
+        request = request_from_state(random_state(rng))
+        s = request_sides(request)
+        for kind in ('prefixes', 'suffixes'):
+            sides.append((s[f'{kind}_item1'], s[f'{kind}_item2'], s[f'desired_{kind}'], s[f'not_desired_{kind}']))
+            bases.append(request.base)
+    return sides, np.array(bases)
+
+
+def test_modifier_kernel_matches_scalar():
+    sides, bases = random_sides(3, 1500)
+    masks = side_masks(sides)
+    got = modifier_probability_batch(**masks, base=bases)
+    for (mods_item1, mods_item2, desired, not_desired), base, prob in zip(sides, bases, got):
+        assert prob == calculate_modifier_probability(mods_item1, mods_item2, desired, not_desired,
+                                                      base == 1, base == 2)
+
+def test_selection_kernel_matches_scalar():
+    sides, _ = random_sides(4, 500)
+    masks = side_masks(sides)
+    for winning_base in (1, 2):
+        available = available_mask(masks['native_item1'], masks['native_item2'], masks['non_native_item1'],
+                                   masks['non_native_item2'], winning_base)
+        for outcome_count in range(4):
+            got = selection_probability_batch(available, masks['desired'], masks['not_desired'], outcome_count)
+            for (mods_item1, mods_item2, desired, not_desired), prob in zip(sides, got):
+                assert prob == calculate_selection_probability(mods_item1 + mods_item2, desired, not_desired,
+                                                               outcome_count, winning_base, DEFAULT_RULES)
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from engine import evaluate
+from lookup import LookupTable, write_table
+from tests.scenarios import random_state, request_from_state
+
+
+@pytest.fixture(scope='module')
+def table_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('lookup') / 'side_table.bin')
+    write_table(path)
+    return path
+
+
+def test_table_covers_every_side_key(table_path):
+    table = LookupTable.load(table_path)
+    rng = random.Random(4)
+    for _ in range(2000):
+        request = request_from_state(random_state(rng))
+        computed = {}
+        result = evaluate(request, computed)
+        assert all(key in table for key in computed), request
+        assert evaluate(request, table) == result
+
+def test_exact_table(table_path):
+    table = LookupTable.load(table_path, exact=True)
+    rng = random.Random(5)
+    for _ in range(500):
+        request = request_from_state(random_state(rng))
+        assert evaluate(request, table, exact=True) == evaluate(request, exact=True)
+
+def test_table_is_read_only(table_path):
+    table = LookupTable.load(table_path)
+    size = len(table)
+    table[12345] = 0.5
+    assert len(table) == size and table.get(12345) is None
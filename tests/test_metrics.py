@@ -0,0 +1,39 @@
+import random
+from collections import Counter
+
+import pytest
+
+import metrics
+from engine import evaluate
+from tests.scenarios import random_state, request_from_state
+
+
+@pytest.fixture
+def probe():
+    yield metrics.enable()
+    metrics.disable()
+
+
+def test_snapshot_counters(probe):
+    rng = random.Random(19)
+    requests = [request_from_state(random_state(rng)) for _ in range(400)]
+    expected = [evaluate(request, {}) for request in requests]
+    probe.reset()
+
+    cache = {}
+    assert [evaluate(request, cache) for request in requests] == expected
+    snapshot = probe.snapshot()
+    computed = snapshot['outcomes']['computed']
+    assert snapshot['evaluations'] == sum(snapshot['outcomes'].values()) == len(requests)
+    assert snapshot['stages']['validate']['calls'] == len(requests)
+    assert snapshot['stages']['prefix_side']['calls'] == snapshot['stages']['suffix_side']['calls'] == computed
+    assert snapshot['side_cache']['hits'] + snapshot['side_cache']['misses'] == 2 * computed
+    assert snapshot['side_cache']['misses'] == len(cache)
+    errors = Counter(code for _, code in expected if code)
+    assert {code: n for code, n in snapshot['outcomes'].items() if code.startswith('error_')} == errors
+
+def test_without_side_cache_every_lookup_misses(probe):
+    request = request_from_state(random_state(random.Random(5)))
+    for _ in range(3): evaluate(request)
+    side_cache = probe.snapshot()['side_cache']
+    assert side_cache['hits'] == 0 and side_cache['misses'] == 2 * probe.outcomes['computed']
@@ -0,0 +1,15 @@
+import montecarlo
+from engine import evaluate
+
+
+def test_cross_check_matches_the_regression_set():
+    results = montecarlo.cross_check(montecarlo.REGRESSION_SET, trials=200_000, seed=0)
+    assert montecarlo.unexpected(results) == []
+    # the tagged divergences are real: dropping the tags turns them into failures
+    assert {r.name for r in montecarlo.unexpected(results, {})} == set(montecarlo.EXPECTED_DIVERGENCE)
+
+def test_simulation_is_reproducible_with_a_seed():
+    name, request = montecarlo.REGRESSION_SET[1]
+    first, second = (montecarlo.simulate(request, 100_000, seed=3) for _ in range(2))
+    assert first == second
+    assert first.low <= evaluate(request)[0] <= first.high
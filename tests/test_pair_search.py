@@ -0,0 +1,44 @@
+import heapq
+import io
+
+import pair_search
+from benchmarks.corpora import stash_dump
+from engine import DESIRED, Scenario, evaluate_scenario
+from registry import ModRegistry
+from stash_parser import iter_items
+
+TARGETS = ['+# to maximum Life', '#% increased Attack Speed']
+
+
+def packed_stash(n=150):
+    registry = ModRegistry()
+    parsed = list(iter_items(io.StringIO(stash_dump(n)), registry))
+    target_ids = {registry.register(text) for text in TARGETS}
+    return registry, target_ids, [pair_search.pack_item(item, target_ids, registry) for item in parsed]
+
+def test_only_pairs_covering_every_target_are_scored():
+    registry, target_ids, items = packed_stash()
+    mods = [{registry.name(mod_id) for mod_id in item[0]} for item in items]
+
+    found = pair_search.search_pairs(items, target_ids, top_k=3, workers=1, pairs_per_chunk=500)
+    assert found
+    for i, partners in found.items():
+        for _, j in partners:
+            assert set(TARGETS) <= mods[i] | mods[j], (i, j)
+
+    # Brute force over the covering pairs only.
+    expected = {}
+    for i in range(len(items)):
+        for j in range(len(items)):
+            if i == j or not set(TARGETS) <= mods[i] | mods[j]: continue
+            (mods_a, desired_a, _), (mods_b, desired_b, _) = items[min(i, j)], items[max(i, j)]
+            prob, error_code = evaluate_scenario(Scenario(mods_a + mods_b, (desired_a | desired_b << 6) << DESIRED))
+            if not error_code and prob: expected.setdefault(i, []).append((prob, j))
+    assert found == {i: heapq.nlargest(3, candidates) for i, candidates in sorted(expected.items())}
+
+def test_item_missing_a_target_needs_a_partner_holding_it():
+    _, target_ids, items = packed_stash()
+    goal = (1 << len(target_ids)) - 1
+    for i, partners in pair_search.search_pairs(items, target_ids, workers=1).items():
+        for _, j in partners:
+            assert items[i][2] | items[j][2] == goal
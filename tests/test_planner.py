@@ -0,0 +1,67 @@
+import math
+
+from engine import PREFIX, SUFFIX, Affix, RecombinationRequest, evaluate
+from planner import Planner, _subsets
+
+LIFE, MANA, SPEED = '+# to maximum Life', '+# to maximum Mana', '#% increased Attack Speed'
+
+
+def item(*affixes):
+    return tuple(Affix(mod, kind) for mod, kind in affixes)
+
+POOL = [
+    item(('+40 to maximum Life', PREFIX), ('+12 to Armour', PREFIX)),
+    item(('+60 to maximum Mana', PREFIX), ('+20% to Fire Resistance', SUFFIX)),
+    item(('7% increased Attack Speed', SUFFIX), ('+30 to Dexterity', SUFFIX)),
+    item(('+38 to maximum Life', PREFIX), ('+55 to maximum Mana', PREFIX), ('+12 to Armour', PREFIX)),
+    item(('+12 to Armour', PREFIX)),
+]
+
+
+def brute_force_cost(planner, items, costs):
+    """Cheapest cost of every signature by relaxing all pairs until nothing improves."""
+    best = {}
+    for affixes, cost in zip(items, costs):
+        signature = planner.signature(affixes)
+        if signature[0]: best[signature] = min(cost, best.get(signature, math.inf))
+    changed = True
+    while changed:
+        changed = False
+        for a, cost_a in list(best.items()):
+            for b, cost_b in list(best.items()):
+                for desired in _subsets(a[0] | b[0]):
+                    if desired & a[0] == desired or desired & b[0] == desired: continue
+                    prob = planner.probability(a, b, desired)
+                    if not prob: continue
+                    product, cost = (desired, 0, 0), (cost_a + cost_b) / prob
+                    if cost < best.get(product, math.inf) - 1e-12:
+                        best[product] = cost
+                        changed = True
+    return min((cost for s, cost in best.items() if s[0] & planner.goal == planner.goal), default=None)
+
+
+def test_plan_is_cheapest_on_a_small_pool():
+    planner = Planner([LIFE, MANA], [SPEED])
+    costs = [1.0, 2.0, 1.5, 6.0, 0.5]
+    plan = planner.plan(POOL, costs)
+    assert math.isclose(plan.cost, brute_force_cost(Planner([LIFE, MANA], [SPEED]), POOL, costs))
+    assert plan.final.signature[0] == planner.goal and math.isclose(plan.steps[-1].cost, plan.cost)
+    made = set()
+    for step in plan.steps:
+        for node in (step.left, step.right):
+            assert node.item is not None or node.signature in made
+        made.add((step.desired, 0, 0))
+
+def test_step_probability_is_evaluate():
+    planner = Planner([LIFE, MANA], [SPEED])
+    life, mana_speed = planner.signature(POOL[0]), planner.signature(POOL[1] + POOL[2][:1])
+    request = RecombinationRequest(
+        (Affix('Life', PREFIX, desired=True), Affix('Armour', PREFIX)),
+        (Affix('Mana', PREFIX, desired=True), Affix('Speed', SUFFIX, desired=True), Affix('Fire', SUFFIX)))
+    assert math.isclose(planner.probability(life, mana_speed, 0b1011), evaluate(request)[0])
+
+def test_trivial_and_unreachable_targets():
+    planner = Planner([LIFE, MANA], [])
+    plan = planner.plan(POOL)
+    assert plan.steps == [] and plan.final.item == 3 and plan.cost == 1.0
+    assert Planner([LIFE], ['+#% to Cold Resistance']).plan(POOL) is None
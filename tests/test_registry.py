@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from registry import ModRegistry, normalize
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / 'mods.json')
+    registry = ModRegistry()
+    life = registry.register('+40(35–44) to maximum Life')
+    speed = registry.register('7(5–7)% increased Attack Speed T6')
+    raw = registry.intern('Siphoning Strikes')
+    assert registry.register('+38 to maximum Life') == life
+    registry.save(path)
+
+    loaded = ModRegistry.load(path)
+    assert len(loaded) == len(registry) == 3
+    for mod_id, text in ((life, '+# to maximum Life'), (speed, '#% increased Attack Speed'), (raw, 'Siphoning Strikes')):
+        assert loaded.name(mod_id) == text and loaded.lookup(text) == mod_id
+    # New mods continue after the saved ids.
+    assert loaded.register('+20% to Cold Resistance') == 4
+
+def test_open_and_version(tmp_path):
+    path = tmp_path / 'mods.json'
+    assert len(ModRegistry.open(str(path))) == 0
+    path.write_text(json.dumps({'version': 99, 'mods': []}), encoding='utf-8')
+    with pytest.raises(ValueError):
+        ModRegistry.load(str(path))
+
+def test_normalize():
+    assert normalize('Adds 3(2–4) to 9(8–10) Physical Damage') == 'Adds # to # Physical Damage'
+    assert normalize('+12.5% to Fire Resistance') == '+#% to Fire Resistance'
+    assert ModRegistry().lookup('unknown') is None
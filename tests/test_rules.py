@@ -0,0 +1,50 @@
+import json
+import os
+import random
+
+import pytest
+
+from engine import evaluate
+from rules import DEFAULT_RULES, RULES_DIR, RULES_SHIFT, compile_rules, load_rules
+from tests.scenarios import random_state, request_from_state
+
+
+def v1_data():
+    with open(os.path.join(RULES_DIR, 'v1.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def alternative_rules():
+    data = v1_data()
+    data.update(version='test-alt', key_id=4001, base_weight=0.75)
+    data['count_probabilities']['4'] = {'1': 0.2, '2': 0.5, '3': 0.3}
+    data['non_native']['drop_on_losing_base'] = False
+    return compile_rules(data)
+
+
+def test_two_rulesets_share_one_side_cache():
+    alt = alternative_rules()
+    shared = {}
+    rng = random.Random(17)
+    differs = 0
+    for _ in range(500):
+        request = request_from_state(random_state(rng))
+        v1, other = evaluate(request, shared), evaluate(request, shared, rules=alt)
+        assert v1 == evaluate(request, {}) and other == evaluate(request, {}, rules=alt)
+        differs += v1 != other
+    assert differs > 50
+    assert {key >> RULES_SHIFT for key in shared} == {DEFAULT_RULES.key_id, alt.key_id}
+
+def test_missing_count_names_file_and_count(tmp_path):
+    data = v1_data()
+    data.update(version='test-missing', key_id=4002)
+    del data['count_probabilities']['5']
+    path = tmp_path / 'broken.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    with pytest.raises(ValueError, match=r'broken\.json: .*5 mods'):
+        load_rules(str(path))
+
+def test_count_zero_may_be_omitted():
+    data = v1_data()
+    data.update(version='test-no-zero', key_id=4003)
+    del data['count_probabilities']['0']
+    assert compile_rules(data).count_probabilities[0] == ((0, 1.0),)
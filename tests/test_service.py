@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+import service
+from engine import evaluate, request_from_dict
+
+SCENARIO = {'item1': [{'mod': 'Life', 'desired': True}],
+            'item2': [{'mod': 'Speed', 'type': 'suffix', 'desired': True}]}
+
+
+async def call(app, method, path, payload=None):
+    messages = [{'type': 'http.request', 'body': json.dumps(payload).encode(), 'more_body': False}]
+    sent = []
+    async def receive(): return messages.pop(0)
+    async def send(message): sent.append(message)
+    await app({'type': 'http', 'method': method, 'path': path, 'query_string': b''}, receive, send)
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+def run_concurrently(app, *payloads):
+    async def main():
+        calls = [call(app, 'POST', '/evaluate', payload) for payload in payloads]
+        return await asyncio.wait_for(asyncio.gather(*calls), 5)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('base', [1.0, True, '1', 3])
+def test_non_int_base_is_a_bad_request(base):
+    app = service.CalculatorApp()
+    (status, body), (ok_status, ok_body) = run_concurrently(app, dict(SCENARIO, base=base), SCENARIO)
+    assert status == 400 and body['error']['code'] == service.ERROR_INVALID_REQUEST
+    assert ok_status == 200 and 'probability' in ok_body
+
+def test_raising_evaluation_does_not_stall_the_batch(monkeypatch):
+    evaluate_scenarios = service.evaluate_scenarios
+    def flaky(scenarios, *args):
+        if any(scenario.base == 2 for scenario in scenarios): raise RuntimeError('boom')
+        return evaluate_scenarios(scenarios, *args)
+    monkeypatch.setattr(service, 'evaluate_scenarios', flaky)
+
+    app = service.CalculatorApp()
+    results = run_concurrently(app, dict(SCENARIO, base=2), SCENARIO, [SCENARIO, SCENARIO])
+    assert results[0] == (500, service.error_body(service.ERROR_INTERNAL))
+    assert results[1] == (200, {'probability': evaluate(request_from_dict(SCENARIO))[0]})
+    assert results[2][0] == 200 and len(results[2][1]) == 2
+    assert app.batcher.batches == 1 and app.batcher.evaluated == 3
+
+def test_large_request_is_split_round_robin():
+    app = service.CalculatorApp(service.MicroBatcher(window=0.001, max_batch=4))
+    scenarios = [dict(SCENARIO, base=i % 3) for i in range(10)]
+    order = []
+    async def timed(payload, name):
+        result = await call(app, 'POST', '/evaluate', payload)
+        order.append(name)
+        return result
+    async def main():
+        big = asyncio.ensure_future(timed(scenarios, 'big'))
+        await asyncio.sleep(0)
+        small = await timed(SCENARIO, 'small')
+        return await big, small
+    (status, body), (small_status, _) = asyncio.run(main())
+    assert status == small_status == 200
+    assert body == [{'probability': evaluate(request_from_dict(s))[0]} for s in scenarios]
+    assert order == ['small', 'big'] and app.batcher.batches == 3
@@ -0,0 +1,47 @@
+import io
+
+from engine import parse_item_text
+from registry import ModRegistry, normalize
+from stash_parser import _synthetic_dump, iter_items
+
+ITEMS = [
+    'Item Class: Rings\nRarity: Rare\nDusk Loop\nRuby Ring\n--------\nItem Level: 80\n--------\n'
+    '{ Prefix Modifier "Hale" (Tier: 8) }\n+40(35–44) to maximum Life\n'
+    '{ Suffix Modifier "of the Kiln" (Tier: 4) }\n+28(26–30)% to Fire Resistance\n',
+
+    'Item Class: Body Armours\nRarity: Rare\nHavoc Shell\nSaint\'s Hauberk\n--------\n'
+    '{ Prefix Modifier "Fecund" — Life }\n+98(90–99) to maximum Life T2\n'
+    '{ Prefix Modifier "Seraphim\'s" (Tier: 1) }\n+12(10–14)% increased Armour and Energy Shield\n'
+    '{ Suffix Modifier "of Tzteosh" (Tier: 1) }\n+45(43–48)% to Fire Resistance\n'
+    '{ Suffix Modifier "of the Polar Bear" — Elemental, Cold, Resistance }\n+38(36–41)% to Cold Resistance\n'
+    '{ Suffix Modifier "of Skill" (Tier: 6) }\n7(5–7)% increased Attack Speed\n',
+
+    'Item Class: Amulets\nRarity: Magic\nAzure Amber Amulet\n--------\n'
+    '{ Prefix Modifier "Azure" (Tier: 5) }\n+60(55–64) to maximum Mana\n',
+]
+
+
+def test_matches_parse_item_text():
+    parsed = list(iter_items(io.StringIO(''.join(ITEMS))))
+    assert [item.index for item in parsed] == list(range(len(ITEMS)))
+    for item, text in zip(parsed, ITEMS):
+        prefixes, suffixes = parse_item_text(text)
+        assert [mod.text for mod in item.prefixes] == prefixes
+        assert [mod.text for mod in item.suffixes] == suffixes
+
+def test_tiers_ranges_and_ids():
+    registry = ModRegistry()
+    first, second, _ = iter_items(io.StringIO(''.join(ITEMS)), registry)
+    assert first.item_class == 'Rings' and first.name == 'Dusk Loop'
+    life = first.prefixes[0]
+    assert (life.name, life.tier, life.ranges) == ('Hale', 8, ((35, 44),))
+    assert second.prefixes[0].tier == 2 and second.prefixes[0].text == '+98 to maximum Life'
+    for item in (first, second):
+        for mod in item.prefixes + item.suffixes:
+            assert mod.mod_id == registry.lookup(normalize(mod.text))
+    # Different rolls of one mod share its id.
+    assert first.suffixes[0].mod_id == second.suffixes[0].mod_id == registry.lookup('+#% to Fire Resistance')
+    assert first.prefixes[0].mod_id == second.prefixes[0].mod_id
+
+def test_streams_large_dumps():
+    assert sum(1 for _ in iter_items(_synthetic_dump(2000))) == 2000
@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+
+import pytest
+
+from store import RECORD, ResultStore
+
+
+def test_append_reopen_compact(tmp_path):
+    path = str(tmp_path / 'results.rcs')
+    store = ResultStore(path)
+    store[1] = 0.5
+    store[7] = 0.125
+    store.close()
+
+    store = ResultStore(path)
+    assert store.get(1) == 0.5 and store.get(7) == 0.125 and store.get(3) is None
+    assert store.compact() == 2
+    store[3] = 0.25
+    store.close()
+
+    store = ResultStore(path)
+    assert store.stats()['indexed'] == 2 and len(store) == 3
+    assert [store.get(key) for key in (1, 3, 7)] == [0.5, 0.25, 0.125]
+    store.close()
+
+def test_miss_refreshes_from_other_writers(tmp_path):
+    path = str(tmp_path / 'results.rcs')
+    reader, writer = ResultStore(path, refresh_interval=0), ResultStore(path)
+    assert reader.get(42) is None
+    writer[42] = 0.75
+    assert reader.get(42) == 0.75
+    reader.close()
+    writer.close()
+
+def test_log_with_partial_record_is_rejected(tmp_path):
+    path = str(tmp_path / 'results.rcs')
+    ResultStore(path).close()
+    with open(path, 'ab') as f: f.write(RECORD.pack(1, 0.5)[:5])
+    with pytest.raises(ValueError):
+        ResultStore(path)
+
+def test_second_opener_that_lost_the_creation_race(tmp_path, monkeypatch):
+    path = str(tmp_path / 'results.rcs')
+    first = ResultStore(path)
+    first[1] = 0.5
+    # The second worker checked for the log just before the first one created it.
+    monkeypatch.setattr(os.path, 'exists', lambda name: False)
+    second = ResultStore(path)
+    second[2] = 0.25
+    monkeypatch.undo()
+    store = ResultStore(path)
+    assert len(store) == 2 and store.get(1) == 0.5 and store.get(2) == 0.25
+    for s in (first, second, store): s.close()
+
+
+def _write_keys(path, start, barrier):
+    barrier.wait()
+    store = ResultStore(path)
+    for key in range(start, start + 500): store[key] = key / 1024
+    store.close()
+
+def test_concurrent_writers_share_one_log(tmp_path):
+    # The writers open a new store together, so they race to create the log.
+    context = multiprocessing.get_context('fork')
+    starts = range(0, 40000, 10000)
+    for attempt in range(10):
+        path = str(tmp_path / f'results{attempt}.rcs')
+        barrier = context.Barrier(len(starts))
+        workers = [context.Process(target=_write_keys, args=(path, start, barrier)) for start in starts]
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        assert all(worker.exitcode == 0 for worker in workers)
+
+        store = ResultStore(path)
+        assert len(store) == 500 * len(starts)
+        assert all(store.get(key) == key / 1024 for start in starts for key in range(start, start + 500))
+        store.close()
+        assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
@@ -0,0 +1,37 @@
+import random
+
+from engine import evaluate
+from sweep import sweep
+from tests.scenarios import random_state, request_from_state
+
+
+def variant_state(state, variant):
+    """The session state the UI would have after applying `variant`."""
+    changed = dict(state)
+    if variant.field == 'base':
+        changed['item1_base_desired'] = variant.value == 1
+        changed['item2_base_desired'] = variant.value == 2
+    else:
+        changed[f'item{variant.item}_check_{variant.field}_{variant.slot}'] = variant.value
+    return changed
+
+
+def test_variants_match_evaluate():
+    rng = random.Random(18)
+    for _ in range(300):
+        state = random_state(rng)
+        request = request_from_state(state)
+        result = sweep(request)
+        assert (result.probability, result.error_code) == evaluate(request)
+        filled = sum(bool(state[f'item{n}_input_{i}'].strip()) for n in (1, 2) for i in range(6))
+        assert len(result.variants) == 4 * filled + 2
+        for variant in result.variants:
+            assert (variant.probability, variant.error_code) == evaluate(request_from_state(variant_state(state, variant)))
+
+def test_variants_are_ranked():
+    rng = random.Random(3)
+    for _ in range(100):
+        variants = sweep(request_from_state(random_state(rng))).variants
+        valid = [v.probability for v in variants if v.error_code is None]
+        assert valid == sorted(valid, reverse=True)
+        assert all(v.error_code is not None for v in variants[len(valid):])
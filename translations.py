@@ -0,0 +1,72 @@
+"""UI strings for the calculator, keyed by language.
+
+The error keys double as the stable error codes returned by `engine.evaluate`.
+"""
+translations = {
+    "English": {
+        "title": "Recombinator Calculator",
+        "first_item": "First Item",
+        "second_item": "Second Item",
+        "desired_base": "Desired Final Base",
+        "calculate": "Calculate",
+        "probability": "Probability of getting desired affixes:",
+        "reset": "Reset",
+        "live_update": "Live update",
+        "what_if": "What if?",
+        "what_if_change": "Change",
+        "what_if_on": "on",
+        "what_if_off": "off",
+        "what_if_delta": "Difference",
+        "what_if_probability": "Probability",
+        "base_any": "Any base",
+        "base_item": "Base of item",
+        "error_exclusive": "You can have at most 1 exclusive modifier on the final item (Except 1P/1S combination).",
+        "error_both_bases": "Cannot select both bases as desired",
+        "error_too_many_desired": "Please do not pick more than 3 unique prefixes/suffixes as desired",
+        "error_no_desired": "Please pick at least 1 desired modifier",
+        "error_pref_conflict": "Cannot select a modifier as both Desired and Not Desired",
+        "error_both_non_native": "Both items contain Non-Native Desired mods. Please select one as Desired Base manually, or remove one.",
+        "error_runtime": "A critical calculation error occurred.",
+        "error_non_native_manual": "One item contains Non-Native Desired mods. Please select the Base of the item containing the Non-Native mod as 'Desired Final Base' for a successful result.",
+        "exclusive": "Exclusive",
+        "non_native": "Non-Native",
+        "desired": "Desired",
+        "not_desired": "Not Desired",
+        "paste_item": "Paste Item",
+        "tooltip_paste": "Use Control + Alt + C when copying your item in game.",
+        "tooltip_type": "Exclusive: Only one allowed. Exception: 1 Ex Prefix + 1 Ex Suffix can give ~55% chance if they are the ONLY two mods. Non-Native: Mods drop if the base that cannot naturally roll them wins."
+    },
+    "Turkish": {
+        "title": "Recombinator Hesaplayıcısı",
+        "first_item": "İlk Item",
+        "second_item": "İkinci Item",
+        "desired_base": "İstediğiniz Final Base",
+        "calculate": "Hesapla",
+        "probability": "İstediğiniz affixlerin gelme olasılığı:",
+        "reset": "Sıfırla",
+        "live_update": "Canlı hesapla",
+        "what_if": "Ya şöyle olsaydı?",
+        "what_if_change": "Değişiklik",
+        "what_if_on": "açık",
+        "what_if_off": "kapalı",
+        "what_if_delta": "Fark",
+        "what_if_probability": "Olasılık",
+        "base_any": "Herhangi bir base",
+        "base_item": "Base olarak item",
+        "error_exclusive": "Final itemde maksimum 1 adet exclusive modifier olabilir (1P/1S kombinasyonu hariç).",
+        "error_both_bases": "Her iki base'i de istediğiniz olarak seçemezsiniz",
+        "error_too_many_desired": "Lütfen 3'ten fazla farklı prefix/suffix'i istediğiniz olarak seçmeyin",
+        "error_no_desired": "Lütfen en az 1 adet istediğiniz modifier seçin",
+        "error_pref_conflict": "Bir modifier'ı hem İstiyorum hem de İstemiyorum olarak seçemezsiniz",
+        "error_both_non_native": "Her iki item de Non-Native İstediğiniz modlar içeriyor. Lütfen birini elle İstediğiniz Base olarak seçin veya birindeki modları kaldırın.",
+        "error_runtime": "Kritik bir hesaplama hatası oluştu.",
+        "error_non_native_manual": "Bir item Non-Native İstediğiniz modlar içeriyor. Başarılı bir sonuç için lütfen Non-Native mod içeren itemin Base'ini 'İstediğiniz Final Base' olarak seçin.",
+        "exclusive": "Exclusive",
+        "non_native": "Non-Native",
+        "desired": "İstiyorum",
+        "not_desired": "İstemiyorum",
+        "paste_item": "Item Yapıştır",
+        "tooltip_paste": "Oyun içindeki iteminizi kopyalarken Control + Alt + C kullanın.",
+        "tooltip_type": "Exclusive: Sadece bir tanesine izin verilir. İstisna: Eğer SADECE 1 Ex Prefix + 1 Ex Suffix varsa şans ~55%'e çıkarır. Non-Native: Modlar, onları doğal olarak rollayamayan base kazanırsa düşer."
+    }
+}
@@ -0,0 +1,16 @@
+"""Static UI assets, read from disk once per process on first use.
+
+Streamlit re-runs the page script on every interaction; keeping the CSS in
+`style.css` behind a process-wide cache means a rerun neither rebuilds nor
+re-reads it, and headless entry points never touch it.
+"""
+import os
+from functools import lru_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def stylesheet():
+    with open(os.path.join(HERE, 'style.css'), encoding='utf-8') as f:
+        return f.read()